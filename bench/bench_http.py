@@ -0,0 +1,183 @@
+"""Host benchmark: one-shot HTTP/1.0 requests vs the keep-alive pools
+
+A stand-in for the API runs in a child process on loopback (HTTP/1.1,
+keep-alive, astros.json sized body; /chunked sends it chunked). The
+same GETs are made through urequests with a new socket each time
+("one-shot", what query_api() did) and through a urequests.Pool, then
+the same through urequests_async and its Pool (the periodic polls). It
+reports the per-request latency, the heap allocated per request
+(tracemalloc peak, as in bench_transfer.py) and how many connections the
+server accepted. Before timing, it checks:
+- chunked framing;
+- that a pooled connection stays usable between requests;
+- that a connection the server dropped is detected or retried.
+
+Loopback has no round trip to speak of, so the latency gap here is only
+the socket setup; over WiFi each saved handshake is a full RTT, plus the
+DNS lookup.
+
+    python3 bench/bench_http.py
+"""
+import http.server
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+# utime (for dns_cache) from the simulator's stand-ins
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sim', 'modules'))
+
+import asyncio
+import urequests
+import urequests_async
+
+REQUESTS = 200
+# Seconds the stand-in keeps an idle connection open
+SERVER_IDLE = 1.0
+
+BODY = json.dumps({
+    'message': 'success',
+    'number': 12,
+    'people': [{'craft': 'ISS', 'name': 'Astronaut Number {}'.format(i)} for i in range(12)],
+}).encode()
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = SERVER_IDLE
+    # Headers and body go out as separate writes; do not let Nagle hold the body
+    disable_nagle_algorithm = True
+    connections = 0
+
+    def setup(self):
+        Handler.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('X-Connections', str(Handler.connections))
+        if self.path == '/chunked':
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for i in range(0, len(BODY), 100):
+                part = BODY[i:i + 100]
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(part), part))
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self.send_header('Content-Length', str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+def serve():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    print(server.server_address[1], flush=True)
+    server.serve_forever()
+
+def connections(r):
+    return int(r.header('X-Connections'))
+
+def check(url):
+    pool = urequests.Pool()
+    r = urequests.get(url + '/chunked', pool=pool)
+    assert bytes(r.content) == BODY, 'chunked body'
+    first = connections(r)
+    r = urequests.get(url + '/', pool=pool)
+    assert bytes(r.content) == BODY and connections(r) == first, 'connection not reused'
+    # Let the server drop the idle connection: the pool notices
+    time.sleep(SERVER_IDLE + 0.5)
+    r = urequests.get(url + '/', pool=pool)
+    assert bytes(r.content) == BODY and connections(r) == first + 1, 'stale connection used'
+    # Same, with the liveness check fooled: the request is retried
+    time.sleep(SERVER_IDLE + 0.5)
+    pool._alive = lambda sock: True
+    r = urequests.get(url + '/', pool=pool)
+    assert bytes(r.content) == BODY and pool.retries == 1, 'stale connection not retried'
+    pool.close()
+
+async def get_async(url, pool):
+    r = await urequests_async.get(url, pool=pool)
+    body = b''
+    while True:
+        data = await r.read(256)
+        if not data:
+            break
+        body += data
+    r.close()
+    return r, body
+
+async def check_async(url):
+    pool = urequests_async.Pool()
+    r, body = await get_async(url + '/chunked', pool)
+    assert body == BODY, 'async chunked body'
+    first = connections(r)
+    r, body = await get_async(url + '/', pool)
+    assert body == BODY and connections(r) == first, 'async connection not reused'
+    await asyncio.sleep(SERVER_IDLE + 0.5)
+    r, body = await get_async(url + '/', pool)
+    assert body == BODY and connections(r) == first + 1, 'async stale connection used'
+    await asyncio.sleep(SERVER_IDLE + 0.5)
+    pool._alive = lambda conn: True
+    r, body = await get_async(url + '/', pool)
+    assert body == BODY and pool.retries == 1, 'async stale connection not retried'
+    pool.close()
+
+async def run_async(url, pool):
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        r, body = await get_async(url, pool)
+    per_request = (time.perf_counter() - start) * 1000 / REQUESTS
+    return per_request, connections(r)
+
+def run(url, pool):
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        r = urequests.get(url, pool=pool)
+    per_request = (time.perf_counter() - start) * 1000 / REQUESTS
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    r = urequests.get(url, pool=pool)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return per_request, peak, connections(r)
+
+def main():
+    child = subprocess.Popen([sys.executable, __file__, '--serve'], stdout=subprocess.PIPE, text=True)
+    try:
+        url = 'http://127.0.0.1:{}'.format(child.stdout.readline().strip())
+        check(url)
+        asyncio.run(check_async(url))
+        print('framing, reuse and stale-connection checks passed (sync and async)')
+        before = connections(urequests.get(url + '/'))
+        one_shot = run(url + '/', None)
+        pool = urequests.Pool()
+        pooled = run(url + '/', pool)
+        print('{} GETs of {} bytes'.format(REQUESTS, len(BODY)))
+        print('{:10} {:>12} {:>12} {:>12}'.format('', 'ms/request', 'heap bytes', 'connections'))
+        print('{:10} {:>12.3f} {:>12} {:>12}'.format('one-shot', one_shot[0], one_shot[1], one_shot[2] - before))
+        print('{:10} {:>12.3f} {:>12} {:>12}'.format('pooled', pooled[0], pooled[1], pooled[2] - one_shot[2]))
+        pool.close()
+
+        async def compare():
+            one_shot_async = await run_async(url + '/', None)
+            pool = urequests_async.Pool()
+            pooled_async = await run_async(url + '/', pool)
+            pool.close()
+            return one_shot_async, pooled_async
+        one_shot_async, pooled_async = asyncio.run(compare())
+        print('{:10} {:>12.3f} {:>12} {:>12}'.format('async', one_shot_async[0], '', one_shot_async[1] - pooled[2]))
+        print('{:10} {:>12.3f} {:>12} {:>12}'.format('async pool', pooled_async[0], '', pooled_async[1] - one_shot_async[1]))
+    finally:
+        child.terminate()
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--serve']:
+        serve()
+    else:
+        main()
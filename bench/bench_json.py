@@ -0,0 +1,92 @@
+"""Host benchmark: peak heap of parsing astros.json, loads vs streaming
+
+Synthetic payloads with more and more people are served through
+urequests' response reader from a fake socket. "loads" reads the body
+into its Content-Length bytearray and parses it with json.loads (what
+query_api() did); "stream" feeds it to astros_json as it is read. The
+peak is tracemalloc's, measured while the result is still alive, as in
+query_api(). Both results are checked to agree.
+
+    python3 bench/bench_json.py
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+# utime (for dns_cache) from the simulator's stand-ins
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sim', 'modules'))
+
+import astros_json
+import urequests
+
+CRAFTS = ('ISS', 'Tiangong', 'Crew Dragon Endeavour')
+# Bytes per recv on the Pico's socket
+SEGMENT = 536
+
+class Socket:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+    def readinto(self, buf):
+        n = min(len(buf), SEGMENT, len(self.data) - self.pos)
+        buf[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return n
+    def close(self):
+        pass
+
+def payload(people):
+    body = json.dumps({
+        'message': 'success',
+        'number': people,
+        'people': [{'craft': CRAFTS[i % len(CRAFTS)], 'name': 'Astronaut Number {}'.format(i)}
+                   for i in range(people)],
+    }).encode()
+    head = 'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: {}\r\n\r\n'
+    return head.format(len(body)).encode() + body
+
+def response(data):
+    r = urequests.URLOpener.__new__(urequests.URLOpener)
+    r.status_code = 0
+    r.headers = {}
+    r.content = None
+    r.content_length = None
+    r._pool = None
+    r._start(Socket(data), 'GET')
+    return r
+
+def with_loads(data):
+    return json.loads(response(data).read_body())
+
+def with_stream(data):
+    return astros_json.load(response(data))
+
+def measure(fn, data):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = fn(data)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak - base, elapsed * 1000
+
+def main():
+    limit = astros_json.MAX_PEOPLE
+    print('{:>7} {:>8} {:>12} {:>12} {:>10} {:>10}'.format(
+        'people', 'payload', 'loads peak', 'stream peak', 'loads ms', 'stream ms'))
+    for people in (12, 50, 100, 300, 1000):
+        data = payload(people)
+        loaded, loads_peak, loads_ms = measure(with_loads, data)
+        streamed, stream_peak, stream_ms = measure(with_stream, data)
+        expected = [{'name': p['name'], 'craft': p['craft']} for p in loaded['people'][:limit]]
+        assert streamed == {'number': loaded['number'], 'people': expected}
+        print('{:>7} {:>8} {:>12} {:>12} {:>10.2f} {:>10.2f}'.format(
+            people, len(data), loads_peak, stream_peak, loads_ms, stream_ms))
+    print('(stream keeps at most {} people; number still counts them all)'.format(limit))
+
+if __name__ == '__main__':
+    main()
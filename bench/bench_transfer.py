@@ -0,0 +1,142 @@
+"""Host benchmark: heap allocated by the e-paper transfer layer
+
+On the Pico the allocation of a call is the gc.mem_free() delta across it
+with the collector disabled. Here tracemalloc's peak over the call stands
+in for that delta; it is a lower bound, since CPython frees each copy
+before the next while the Pico keeps all of them until a collection.
+The few dozen bytes left in "after" are CPython's own iterator objects,
+which MicroPython does not allocate for loops over a range() or a tuple.
+machine, framebuf and utime are replaced by minimal stand-ins; the SPI
+only checks that it is given a buffer, so its own bookkeeping does not
+show up in the counts.
+
+"before" reproduces the old transfer code (bytearray(buf) copies and
+Python lists for fills); "after" is the current driver.
+
+    python3 bench/bench_transfer.py
+"""
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+class Pin:
+    OUT = 1
+    IN = 0
+    PULL_UP = 1
+    def __init__(self, pin, mode=None, pull=None):
+        self._value = 1
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = v
+
+class SPI:
+    def __init__(self, bus):
+        pass
+    def init(self, baudrate=0):
+        pass
+    def write(self, buf):
+        if not isinstance(buf, (bytes, bytearray, memoryview)):
+            raise TypeError('object with buffer protocol required')
+
+class FrameBuffer:
+    def __init__(self, buf, width, height, fmt):
+        self.buf = buf
+
+def _module(name, **attrs):
+    mod = types.ModuleType(name)
+    mod.__dict__.update(attrs)
+    sys.modules[name] = mod
+
+_module('machine', Pin=Pin, SPI=SPI)
+_module('framebuf', FrameBuffer=FrameBuffer, MONO_HLSB=3)
+_module('utime', sleep_ms=lambda ms: None, sleep=lambda s: None)
+_module('ujson', loads=json.loads, dumps=json.dumps, load=json.load, dump=json.dump)
+
+import humansinspace_color
+import humansinspace_landscape
+
+def heap_used(fn):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - base
+
+# Old transfer code, as it was before the streaming writer
+def old_send_command(epd, command):
+    epd.digital_write(epd.dc_pin, 0)
+    epd.digital_write(epd.cs_pin, 0)
+    epd.spi.write(bytearray([command]))
+    epd.digital_write(epd.cs_pin, 1)
+
+def old_send_data1(epd, buf):
+    epd.digital_write(epd.dc_pin, 1)
+    epd.digital_write(epd.cs_pin, 0)
+    epd.spi.write(bytearray(buf))
+    epd.digital_write(epd.cs_pin, 1)
+
+def main():
+    os.chdir(tempfile.mkdtemp())
+    c = humansinspace_color.EPD_2IN9_C_Landscape()
+    d = humansinspace_landscape.EPD_2IN9_D_Landscape()
+    plane = c.hw_height * c.hw_width // 8
+
+    def colour_frame_before():
+        old_send_command(c, 0x10)
+        old_send_data1(c, c.buffer_black)
+        old_send_command(c, 0x13)
+        old_send_data1(c, c.buffer_red)
+
+    def colour_frame_after():
+        c.send_command(0x10)
+        c.send_data1(c.buffer_black)
+        c.send_command(0x13)
+        c.send_data1(c.buffer_red)
+
+    def colour_clear_before():
+        old_send_data1(c, [0xff] * c.hw_height * int(c.hw_width / 8))
+        old_send_data1(c, [0xff] * c.hw_height * int(c.hw_width / 8))
+
+    def colour_clear_after():
+        c.send_fill(0xff, plane)
+        c.send_fill(0xff, plane)
+
+    def bw_frame_before():
+        old_send_data1(d, [0x00] * plane)
+        old_send_data1(d, d.hw_buffer)
+
+    def bw_frame_after():
+        d.send_fill(0x00, plane)
+        d.send_data1(d.hw_buffer)
+
+    # The LUTs used to be lists, sliced on every upload
+    m = humansinspace_landscape
+    luts = [list(lut) for lut in (m.EPD_2IN9D_lut_vcomDC, m.EPD_2IN9D_lut_ww,
+                                  m.EPD_2IN9D_lut_bw, m.EPD_2IN9D_lut_bb, m.EPD_2IN9D_lut_wb)]
+
+    def bw_lut_before():
+        for lut in luts:
+            old_send_command(d, 0x20)
+            old_send_data1(d, lut[0:len(lut)])
+
+    cases = [
+        ('colour frame (2 planes)', colour_frame_before, colour_frame_after),
+        ('colour Clear fill (2 planes)', colour_clear_before, colour_clear_after),
+        ('B/W frame (plane fill + frame)', bw_frame_before, bw_frame_after),
+        ('B/W full LUT upload', bw_lut_before, d.SetFullReg),
+    ]
+
+    print('{:36} {:>10} {:>10}'.format('heap allocated (bytes)', 'before', 'after'))
+    for name, before, after in cases:
+        print('{:36} {:>10} {:>10}'.format(name, heap_used(before), heap_used(after)))
+
+if __name__ == '__main__':
+    main()
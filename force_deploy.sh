@@ -60,6 +60,57 @@ $MPREMOTE connect $PICO_DEVICE fs cp src/humansinspace_landscape.py :humansinspa
 echo "Uploading humansinspace_color.py..."
 $MPREMOTE connect $PICO_DEVICE fs cp src/humansinspace_color.py :humansinspace_color.py || { echo -e "${RED}Failed to upload humansinspace_color.py${NC}"; exit 1; }
 
+echo "Uploading epd_rotate.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/epd_rotate.py :epd_rotate.py || { echo -e "${RED}Failed to upload epd_rotate.py${NC}"; exit 1; }
+
+echo "Uploading epd_rotate_viper.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/epd_rotate_viper.py :epd_rotate_viper.py || { echo -e "${RED}Failed to upload epd_rotate_viper.py${NC}"; exit 1; }
+
+echo "Uploading epd_canvas.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/epd_canvas.py :epd_canvas.py || { echo -e "${RED}Failed to upload epd_canvas.py${NC}"; exit 1; }
+
+echo "Uploading huge_digits.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/huge_digits.py :huge_digits.py || { echo -e "${RED}Failed to upload huge_digits.py${NC}"; exit 1; }
+
+echo "Uploading layers.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/layers.py :layers.py || { echo -e "${RED}Failed to upload layers.py${NC}"; exit 1; }
+
+echo "Uploading layout.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/layout.py :layout.py || { echo -e "${RED}Failed to upload layout.py${NC}"; exit 1; }
+
+echo "Uploading frame_cache.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/frame_cache.py :frame_cache.py || { echo -e "${RED}Failed to upload frame_cache.py${NC}"; exit 1; }
+
+echo "Uploading bitmap_font.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/bitmap_font.py :bitmap_font.py || { echo -e "${RED}Failed to upload bitmap_font.py${NC}"; exit 1; }
+
+echo "Uploading font.pf..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/font.pf :font.pf || { echo -e "${RED}Failed to upload font.pf${NC}"; exit 1; }
+
+echo "Uploading screenshot.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/screenshot.py :screenshot.py || { echo -e "${RED}Failed to upload screenshot.py${NC}"; exit 1; }
+
+echo "Uploading epd_seq.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/epd_seq.py :epd_seq.py || { echo -e "${RED}Failed to upload epd_seq.py${NC}"; exit 1; }
+
+echo "Uploading astros_json.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/astros_json.py :astros_json.py || { echo -e "${RED}Failed to upload astros_json.py${NC}"; exit 1; }
+
+echo "Uploading api_cache.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/api_cache.py :api_cache.py || { echo -e "${RED}Failed to upload api_cache.py${NC}"; exit 1; }
+
+echo "Uploading dns_cache.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/dns_cache.py :dns_cache.py || { echo -e "${RED}Failed to upload dns_cache.py${NC}"; exit 1; }
+
+echo "Uploading urequests_async.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/urequests_async.py :urequests_async.py || { echo -e "${RED}Failed to upload urequests_async.py${NC}"; exit 1; }
+
+echo "Uploading poll_scheduler.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/poll_scheduler.py :poll_scheduler.py || { echo -e "${RED}Failed to upload poll_scheduler.py${NC}"; exit 1; }
+
+echo "Uploading sources.py..."
+$MPREMOTE connect $PICO_DEVICE fs cp src/sources.py :sources.py || { echo -e "${RED}Failed to upload sources${NC}"; exit 1; }
+
 echo "Uploading webserver.py..."
 $MPREMOTE connect $PICO_DEVICE fs cp src/webserver.py :webserver.py || { echo -e "${RED}Failed to upload webserver.py${NC}"; exit 1; }
 
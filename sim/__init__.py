@@ -0,0 +1,21 @@
+"""Desktop stand-in for the Pico so the display code runs unchanged on Linux
+
+sim/modules holds pure-Python versions of the MicroPython modules the
+display code imports (machine, framebuf, utime, ujson). install() puts them
+and src/ on sys.path; sim.panel decodes what the drivers sent over the fake
+SPI back into black/red planes and writes them out as PBM/PNG.
+
+    python3 -m sim.run --out sim_out
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = os.path.join(ROOT, 'sim', 'modules')
+SRC = os.path.join(ROOT, 'src')
+
+def install():
+    """Make the stand-in modules and src/ importable (idempotent)"""
+    for path in (SRC, MODULES):
+        if path not in sys.path:
+            sys.path.insert(0, path)
@@ -0,0 +1,154 @@
+"""Pure-Python framebuf, MONO_HLSB only
+
+Follows MicroPython's semantics for clipping, text and blit (including
+(buffer, width, height, format) tuples as blit sources). text() uses a
+classic 5x7 font in the same 8x8 cell and 8 px advance as the built-in
+font, so layouts match the device even though glyph shapes differ a little.
+Like the device, text() works on UTF-8 bytes and draws any byte outside
+32..127 as the box glyph.
+"""
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+
+# Columns of each glyph for chars 32..126, bit 0 at the top
+_FONT_5X7 = bytes.fromhex(
+    '0000000000' '00005f0000' '0007000700' '147f147f14' '242a7f2a12'
+    '2313086462' '3649552250' '0005030000' '001c224100' '0041221c00'
+    '14083e0814' '08083e0808' '0050300000' '0808080808' '0060600000'
+    '2010080402' '3e5149453e' '00427f4000' '4261514946' '2141454b31'
+    '1814127f10' '2745454539' '3c4a494930' '0171090503' '3649494936'
+    '064949291e' '0036360000' '0056360000' '0814224100' '1414141414'
+    '0041221408' '0201510906' '3249794136' '7e1111117e' '7f49494936'
+    '3e41414122' '7f4141221c' '7f49494941' '7f09090901' '3e4149497a'
+    '7f0808087f' '00417f4100' '2040413f01' '7f08142241' '7f40404040'
+    '7f020c027f' '7f0408107f' '3e4141413e' '7f09090906' '3e4151215e'
+    '7f09192946' '4649494931' '01017f0101' '3f4040403f' '1f2040201f'
+    '3f4038403f' '6314081463' '0708700807' '6151494543' '007f414100'
+    '0204081020' '0041417f00' '0402010204' '4040404040' '0001020400'
+    '2054545478' '7f48444438' '3844444420' '384444487f' '3854545418'
+    '087e090102' '0c5252523e' '7f08040478' '00447d4000' '2040443d00'
+    '7f10284400' '00417f4000' '7c04180478' '7c08040478' '3844444438'
+    '7c14141408' '081414187c' '7c08040408' '4854545420' '043f444020'
+    '3c4040207c' '1c2040201c' '3c4030403c' '4428102844' '0c5050503c'
+    '4464544c44' '0008364100' '00007f0000' '0041360800' '1008081008'
+)
+_BOX = b'\x7f\x41\x41\x41\x7f'
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format != MONO_HLSB:
+            raise ValueError('only MONO_HLSB is supported')
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+        self.format = format
+        self.stride = (stride if stride is not None else width + 7) & ~7
+        if len(buffer) < self.stride * height // 8:
+            raise ValueError('buffer too small')
+
+    def _get(self, x, y):
+        return (self.buffer[(y * self.stride + x) >> 3] >> (7 - (x & 7))) & 1
+
+    def _set(self, x, y, c):
+        i = (y * self.stride + x) >> 3
+        bit = 0x80 >> (x & 7)
+        if c:
+            self.buffer[i] |= bit
+        else:
+            self.buffer[i] &= ~bit & 0xff
+
+    def fill(self, c):
+        value = 0xff if c else 0x00
+        size = self.stride * self.height // 8
+        self.buffer[0:size] = bytes([value]) * size
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        if c is None:
+            return self._get(x, y)
+        self._set(x, y, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self.height)
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                self._set(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.fill_rect(x, y, w, 1, c)
+        self.fill_rect(x, y + h - 1, w, 1, c)
+        self.fill_rect(x, y, 1, h, c)
+        self.fill_rect(x + w - 1, y, 1, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        dx = abs(x2 - x1)
+        dy = -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x1, y1, c)
+            if x1 == x2 and y1 == y2:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    def text(self, s, x, y, c=1):
+        for ch in s.encode('utf-8'):
+            if 32 <= ch <= 126:
+                glyph = _FONT_5X7[(ch - 32) * 5:(ch - 31) * 5]
+            else:
+                glyph = _BOX
+            for col, bits in enumerate(glyph):
+                px = x + 1 + col
+                if not 0 <= px < self.width:
+                    continue
+                for row in range(8):
+                    if bits & (1 << row):
+                        self.pixel(px, y + row, c)
+            x += 8
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if isinstance(fbuf, (tuple, list)):
+            fbuf = FrameBuffer(*fbuf)
+        for sy in range(max(0, -y), min(fbuf.height, self.height - y)):
+            for sx in range(max(0, -x), min(fbuf.width, self.width - x)):
+                col = fbuf._get(sx, sy)
+                if palette is not None:
+                    col = palette.pixel(col, 0)
+                if col != key:
+                    self._set(x + sx, y + sy, col)
+
+    def scroll(self, xstep, ystep):
+        # Like the device, the strip scrolled out of keeps its old pixels
+        if xstep < 0:
+            xs = range(0, self.width + xstep)
+        else:
+            xs = range(self.width - 1, xstep - 1, -1)
+        if ystep < 0:
+            ys = range(0, self.height + ystep)
+        else:
+            ys = range(self.height - 1, ystep - 1, -1)
+        for y in ys:
+            for x in xs:
+                self._set(x, y, self._get(x - xstep, y - ystep))
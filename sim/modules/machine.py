@@ -0,0 +1,70 @@
+"""machine stand-in: Pin and SPI that record what the drivers send
+
+Every SPI.write() is appended to SPI.transfers as (dc, bytes), with dc the
+level of the data/command pin at that moment (0 = command, 1 = data), and
+the time spent in write() is added to SPI.write_seconds. BUSY always reads
+as idle.
+"""
+import time
+
+# Pin numbers the Waveshare Pico drivers use
+DC_PIN = 8
+BUSY_PIN = 13
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    registry = {}
+
+    def __init__(self, id, mode=IN, pull=None, value=None):
+        self.id = id
+        self._value = 1 if id == BUSY_PIN else 0
+        if value is not None:
+            self._value = value
+        Pin.registry[id] = self
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = 1 if v else 0
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+    def irq(self, handler=None, trigger=IRQ_RISING):
+        return None
+
+class SPI:
+    transfers = []
+    write_seconds = 0.0
+
+    def __init__(self, id, baudrate=4000000, **kwargs):
+        self.baudrate = baudrate
+
+    def init(self, baudrate=4000000, **kwargs):
+        self.baudrate = baudrate
+
+    def write(self, buf):
+        start = time.perf_counter()
+        if not isinstance(buf, (bytes, bytearray, memoryview)):
+            raise TypeError('object with buffer protocol required')
+        dc = Pin.registry[DC_PIN].value() if DC_PIN in Pin.registry else 1
+        SPI.transfers.append((dc, bytes(buf)))
+        SPI.write_seconds += time.perf_counter() - start
+
+    @classmethod
+    def reset_log(cls):
+        cls.transfers = []
+        cls.write_seconds = 0.0
+
+class RTC:
+    def datetime(self, value=None):
+        return value
@@ -0,0 +1,33 @@
+"""utime stand-in with a virtual clock
+
+Sleeps advance the clock instantly, so the 2 s settle delays and busy
+polling cost no wall time on the host.
+"""
+import time as _time
+
+_now_ms = 0
+
+def ticks_ms():
+    return _now_ms
+
+def ticks_add(ticks, delta):
+    return ticks + delta
+
+def ticks_diff(end, start):
+    return end - start
+
+def sleep_ms(ms):
+    global _now_ms
+    _now_ms += int(ms)
+
+def sleep(seconds):
+    sleep_ms(seconds * 1000)
+
+def time():
+    return int(_time.time())
+
+def localtime(secs=None):
+    return _time.localtime(secs)
+
+def gmtime(secs=None):
+    return _time.gmtime(secs)
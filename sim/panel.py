@@ -0,0 +1,106 @@
+"""Decode captured SPI traffic into panel frames and write images
+
+Panel models the part of the UC8151 controller the drivers use: data
+after 0x10 and 0x13 fills the two RAM planes (black and red on the 2.9"
+C panel; old and new data on the D panel), 0x90/0x91/0x92 restrict writes
+to a partial window, and 0x12 snapshots the planes as a shown frame.
+Planes are portrait MONO_HLSB with 1 = white, like the driver buffers.
+"""
+import struct
+import zlib
+
+class Panel:
+    def __init__(self, width=128, height=296):
+        self.width = width
+        self.height = height
+        self.stride = width // 8
+        size = self.stride * height
+        self.planes = {0x10: bytearray(b'\xff' * size), 0x13: bytearray(b'\xff' * size)}
+        self.frames = []
+        self.command = None
+        self.pos = 0
+        self.args = bytearray()
+        self.window = None
+        self.partial = False
+
+    def feed(self, transfers):
+        for dc, data in transfers:
+            if dc:
+                self._data(data)
+            else:
+                for command in data:
+                    self._command(command)
+
+    def _command(self, command):
+        self.command = command
+        self.pos = 0
+        self.args = bytearray()
+        if command == 0x12:
+            self.frames.append((bytes(self.planes[0x10]), bytes(self.planes[0x13])))
+        elif command == 0x91:
+            self.partial = True
+        elif command == 0x92:
+            self.partial = False
+
+    def _data(self, data):
+        plane = self.planes.get(self.command)
+        if plane is None:
+            self.args += data
+            if self.command == 0x90 and len(self.args) >= 7:
+                a = self.args
+                self.window = (a[0] // 8, a[1] // 8 + 1, (a[2] << 8) | a[3], ((a[4] << 8) | a[5]) + 1)
+            return
+        if self.partial and self.window:
+            bx0, bx1, y0, _ = self.window
+            wbytes = bx1 - bx0
+            for b in data:
+                row, col = divmod(self.pos, wbytes)
+                plane[(y0 + row) * self.stride + bx0 + col] = b
+                self.pos += 1
+        else:
+            plane[self.pos:self.pos + len(data)] = data
+            self.pos += len(data)
+
+    def ink(self, plane, x, y):
+        """True if landscape pixel (x, y) of a portrait plane is inked (0)"""
+        px = y
+        py = self.height - 1 - x
+        return not (plane[py * self.stride + (px >> 3)] >> (7 - (px & 7))) & 1
+
+def write_pbm(path, panel, plane):
+    """Write one plane in landscape as a binary PBM (ink is black)"""
+    width, height = panel.height, panel.width
+    rows = bytearray()
+    for y in range(height):
+        row = bytearray((width + 7) // 8)
+        for x in range(width):
+            if panel.ink(plane, x, y):
+                row[x >> 3] |= 0x80 >> (x & 7)
+        rows += row
+    with open(path, 'wb') as f:
+        f.write(b'P4\n%d %d\n' % (width, height))
+        f.write(rows)
+
+def write_png(path, panel, black, red=None):
+    """Write the composited landscape frame as an RGB PNG"""
+    width, height = panel.height, panel.width
+    raw = bytearray()
+    for y in range(height):
+        raw.append(0)  # filter: none
+        for x in range(width):
+            if red is not None and panel.ink(red, x, y):
+                raw += b'\xd0\x20\x20'
+            elif panel.ink(black, x, y):
+                raw += b'\x00\x00\x00'
+            else:
+                raw += b'\xff\xff\xff'
+
+    def chunk(kind, body):
+        return (struct.pack('>I', len(body)) + kind + body +
+                struct.pack('>I', zlib.crc32(kind + body) & 0xffffffff))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(bytes(raw), 9)))
+        f.write(chunk(b'IEND', b''))
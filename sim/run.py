@@ -0,0 +1,122 @@
+"""Render a layout on the host and report where the time goes
+
+    python3 -m sim.run [--layout color|landscape] [--data astros.json] [--out DIR]
+
+Runs display_space_info() of the chosen module unchanged against the
+stand-in modules, with query_api() answering from --data (or a built-in
+sample) instead of the network. Writes the last shown frame as PBM planes
+and a composited PNG, and prints timings for render, rotation and SPI
+transfer (host time in write() plus the modelled bus time).
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import sim
+
+SAMPLE = {
+    'message': 'success',
+    'number': 12,
+    'people': (
+        [{'craft': 'ISS', 'name': name} for name in (
+            'Oleg Kononenko', 'Nikolai Chub', 'Tracy Caldwell Dyson', 'Matthew Dominick',
+            'Michael Barratt', 'Jeanette Epps', 'Alexander Grebenkin',
+            'Butch Wilmore', 'Sunita Williams')] +
+        [{'craft': 'Tiangong', 'name': name} for name in ('Li Guangsu', 'Li Cong', 'Ye Guangfu')]
+    ),
+}
+
+LAYOUTS = {
+    'color': 'humansinspace_color',
+    'landscape': 'humansinspace_landscape',
+}
+
+def run(layout='color', data=None, out=None):
+    """Render one frame; returns a dict of timings in ms and the Panel"""
+    sim.install()
+    import machine
+    import epd_rotate
+    from sim.panel import Panel, write_pbm, write_png
+
+    # Run in a scratch directory standing in for the Pico's flash, with the
+    # non-Python files deploy.sh uploads next to the modules
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix='sim-'))
+    for name in os.listdir(sim.SRC):
+        if name.endswith('.pf'):
+            shutil.copy(os.path.join(sim.SRC, name), name)
+
+    module = __import__(LAYOUTS[layout])
+    module.query_api = lambda *args, **kwargs: (data if data is not None else SAMPLE, False)
+
+    rotation = [0.0]
+    rotate_planes = epd_rotate.rotate_planes
+
+    def timed_rotate(*args):
+        start = time.perf_counter()
+        rotate_planes(*args)
+        rotation[0] += time.perf_counter() - start
+
+    epd_rotate.rotate_planes = timed_rotate
+    machine.SPI.reset_log()
+    try:
+        start = time.perf_counter()
+        module.display_space_info()
+        total = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        epd_rotate.rotate_planes = rotate_planes
+
+    sent = sum(len(data) for dc, data in machine.SPI.transfers if dc)
+    panel = Panel()
+    panel.feed(machine.SPI.transfers)
+    timings = {
+        'total': total * 1000,
+        'render': (total - rotation[0] - machine.SPI.write_seconds) * 1000,
+        'rotation': rotation[0] * 1000,
+        'transfer_host': machine.SPI.write_seconds * 1000,
+        'transfer_bus': sent * 8 / 4000000 * 1000,
+        'bytes': sent,
+        'frames': len(panel.frames),
+    }
+
+    if out and panel.frames:
+        os.makedirs(out, exist_ok=True)
+        old, new = panel.frames[-1]
+        if layout == 'color':
+            write_pbm(os.path.join(out, 'black.pbm'), panel, old)
+            write_pbm(os.path.join(out, 'red.pbm'), panel, new)
+            write_png(os.path.join(out, 'frame.png'), panel, old, new)
+        else:
+            write_pbm(os.path.join(out, 'black.pbm'), panel, new)
+            write_png(os.path.join(out, 'frame.png'), panel, new)
+    return timings, panel
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--layout', choices=sorted(LAYOUTS), default='color')
+    parser.add_argument('--data', help='astros.json style file to display')
+    parser.add_argument('--out', default='sim_out', help='directory for PBM/PNG output')
+    args = parser.parse_args(argv)
+
+    data = None
+    if args.data:
+        with open(args.data) as f:
+            data = json.load(f)
+    timings, panel = run(args.layout, data, args.out)
+
+    print()
+    print('frames shown:   {frames}'.format(**timings))
+    print('render:         {render:8.1f} ms'.format(**timings))
+    print('rotation:       {rotation:8.1f} ms'.format(**timings))
+    print('transfer:       {transfer_host:8.1f} ms host, {transfer_bus:.1f} ms at 4 MHz ({bytes} bytes)'.format(**timings))
+    print('total:          {total:8.1f} ms'.format(**timings))
+    if panel.frames:
+        print('images written to {}'.format(os.path.abspath(args.out)))
+
+if __name__ == '__main__':
+    sys.exit(main())
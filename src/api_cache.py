@@ -0,0 +1,131 @@
+"""Conditional GET of the API, with the last good response kept in flash
+
+The validators of the last good response from each URL (ETag,
+Last-Modified), a crc32 of the last body and the data parsed from it are
+kept in RAM and in a small JSON file, so they survive a reboot. The next
+request is conditional: a 304 Not Modified returns the kept data with no
+body transferred and nothing parsed. When upstream sends no validators
+the body still comes, but if its crc32 matches the kept one, or another
+source's body parses to the same data, the kept data is returned as is.
+fetch() returns the data with an unchanged flag, for callers that want
+to skip work; the flag is not kept on the instance, so hedged requests
+sharing one ApiCache cannot change each other's answer.
+
+fetch() goes through urequests.POOL and fetch_async() through
+urequests_async.POOL, so successive polls reuse one keep-alive
+connection per host.
+"""
+import ujson
+import urequests
+import urequests_async
+from frame_cache import write_atomic
+
+class ApiCache:
+    def __init__(self, path):
+        self.path = path
+        # URL -> [etag, last_modified]
+        self.validators = {}
+        self.digest = None
+        self.data = None
+        self._loaded = False
+
+    def _load(self):
+        self._loaded = True
+        try:
+            with open(self.path, 'r') as f:
+                saved = ujson.load(f)
+            self.validators = saved.get('validators', {})
+            self.digest = saved.get('digest')
+            self.data = saved['data']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save(self):
+        saved = {
+            'validators': self.validators,
+            'digest': self.digest,
+            'data': self.data,
+        }
+        try:
+            write_atomic(self.path, ujson.dumps(saved).encode())
+        except OSError as e:
+            print('Could not save API cache:', e)
+
+    def _validators(self, url):
+        """(etag, last_modified) to send to url; none until there is data to fall back on"""
+        if not self._loaded:
+            self._load()
+        if self.data is None:
+            return None, None
+        return self.validators.get(url) or (None, None)
+
+    def _status(self, response):
+        """(kept data, True) on a 304, False on another failed status, None to go on"""
+        if response.not_modified and self.data is not None:
+            print('API data not modified (304)')
+            return self.data, True
+        if response.status_code != 200:
+            print("Failed to get data, status code:", response.status_code)
+            return False
+        return None
+
+    def _update(self, url, response, data):
+        """Keep data parsed from a complete 200 response from url
+
+        Returns (data to use, unchanged), or None when there is no data.
+        """
+        if data is None:
+            return None
+        digest = response.body_crc
+        validators = [response.header('ETag'), response.header('Last-Modified')]
+        unchanged = self.data is not None and (digest == self.digest or data == self.data)
+        if unchanged:
+            print('API data unchanged (same body)')
+            data = self.data
+        else:
+            # Not the whole people list: its repr alone could outgrow the parse
+            print("API Response: number", data.get('number'), "with", len(data.get('people', ())), "people")
+        if not unchanged or digest != self.digest or validators != self.validators.get(url):
+            self.validators[url] = validators
+            self.digest = digest
+            self.data = data
+            self._save()
+        return data, unchanged
+
+    def fetch(self, url, parse):
+        """Data at url, parsed from a streamed response with parse(response)
+
+        Returns (data, unchanged), unchanged being True when it is the kept
+        data, or None (with a message) on a failed status or when parse()
+        finds nothing; network errors propagate.
+        """
+        etag, last_modified = self._validators(url)
+        response = urequests.get(url, stream=True, etag=etag, last_modified=last_modified,
+                                pool=urequests.POOL)
+        try:
+            kept = self._status(response)
+            if kept is None:
+                data = parse(response)
+        finally:
+            response.close()
+        if kept is not None:
+            return kept or None
+        return self._update(url, response, data)
+
+    async def fetch_async(self, url, parse, **timeouts):
+        """fetch() through urequests_async; parse is awaited
+
+        timeouts are passed on to urequests_async.get().
+        """
+        etag, last_modified = self._validators(url)
+        response = await urequests_async.get(url, etag=etag, last_modified=last_modified,
+                                             pool=urequests_async.POOL, **timeouts)
+        try:
+            kept = self._status(response)
+            if kept is None:
+                data = await parse(response)
+        finally:
+            response.close()
+        if kept is not None:
+            return kept or None
+        return self._update(url, response, data)
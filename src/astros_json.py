@@ -0,0 +1,253 @@
+"""Pull number and the crew out of an astros.json response as it streams in
+
+The payload looks like
+
+    {"message": "success", "number": 12,
+     "people": [{"craft": "ISS", "name": "Oleg Kononenko"}, ...]}
+
+Only number and the name/craft of each person are wanted. Extractor is a
+byte-at-a-time JSON scanner fed straight from the socket: it keeps the
+container nesting, the current key and one string being collected, and
+skips every other value without building it. Memory is bounded by
+MAX_STRING and MAX_PEOPLE however large the upstream payload grows, and
+craft names are shared between the people on the same craft.
+
+The result has the shape ujson.loads() gave the rest of the code:
+{'number': n, 'people': [{'name': ..., 'craft': ...}, ...]}.
+"""
+
+# Longest name or craft kept, in bytes; longer ones are cut
+MAX_STRING = 64
+# People kept; the rest are skipped (number still comes from the payload)
+MAX_PEOPLE = 64
+# Bytes read from the response at a time
+CHUNK_SIZE = 256
+
+# Scanner states
+_VALUE      = 0     # between tokens
+_STRING     = 1     # inside a string
+_ESCAPE     = 2     # after a backslash
+_UNICODE    = 3     # in the hex digits of a \u escape
+_SCALAR     = 4     # inside a number, true, false or null
+
+# Keys of interest
+_NUMBER     = 1
+_PEOPLE     = 2
+_NAME       = 3
+_CRAFT      = 4
+_KEYS = {b'number': _NUMBER, b'people': _PEOPLE, b'name': _NAME, b'craft': _CRAFT}
+
+_OBJECT     = 0
+_ARRAY      = 1
+
+_ESCAPES = {ord('n'): 10, ord('t'): 9, ord('r'): 13, ord('b'): 8, ord('f'): 12}
+
+class Extractor:
+    def __init__(self):
+        self.number = None
+        self.people = []
+        # Container types, outermost first
+        self._stack = []
+        # Key of the current value at depth 1 (top level) and 3 (a person)
+        self._top_key = None
+        self._person_key = None
+        self._expect_key = False
+        self._person = None
+        self._crafts = {}
+        self._state = _VALUE
+        # The string or scalar being collected, when it is wanted
+        self._text = bytearray(MAX_STRING)
+        self._view = memoryview(self._text)
+        self._length = 0
+        self._truncated = False
+        self._collect = False
+        self._is_key = False
+        self._code = 0
+        self._digits = 0
+        self._high = 0
+
+    def feed(self, data):
+        """Scan the next piece of the payload (bytes, bytearray or memoryview)"""
+        for b in data:
+            state = self._state
+            if state == _STRING:
+                if b == 0x22:           # "
+                    self._state = _VALUE
+                    self._end_string()
+                elif b == 0x5c:         # backslash
+                    self._state = _ESCAPE
+                elif self._collect:
+                    self._add(b)
+                continue
+            if state == _SCALAR:
+                if b != 0x2c and b != 0x7d and b != 0x5d and b > 0x20:
+                    self._add(b)
+                    continue
+                # The delimiter is handled as a token below
+                self._state = state = _VALUE
+                self._end_scalar()
+            if state == _VALUE:
+                if b == 0x22:
+                    self._begin_string()
+                elif b == 0x7b:         # {
+                    self._open(_OBJECT)
+                elif b == 0x5b:         # [
+                    self._open(_ARRAY)
+                elif b == 0x7d or b == 0x5d:    # } ]
+                    self._close()
+                elif b == 0x2c:         # ,
+                    self._expect_key = bool(self._stack) and self._stack[-1] == _OBJECT
+                elif b == 0x3a:         # :
+                    self._expect_key = False
+                elif b > 0x20:
+                    self._state = _SCALAR
+                    self._collect = len(self._stack) == 1 and self._top_key == _NUMBER
+                    self._length = 0
+                    self._add(b)
+            elif state == _ESCAPE:
+                self._state = _STRING
+                if b == 0x75:           # u
+                    self._state = _UNICODE
+                    self._code = 0
+                    self._digits = 0
+                elif self._collect:
+                    self._add(_ESCAPES.get(b, b))
+            else:
+                # _UNICODE
+                self._code = (self._code << 4) | int(chr(b), 16)
+                self._digits += 1
+                if self._digits == 4:
+                    self._state = _STRING
+                    code = self._code
+                    if 0xD800 <= code < 0xDC00:
+                        # First half of a surrogate pair; wait for the second
+                        self._high = code
+                        continue
+                    if 0xDC00 <= code < 0xE000:
+                        if self._high:
+                            code = 0x10000 + ((self._high - 0xD800) << 10) + code - 0xDC00
+                        else:
+                            code = 0xFFFD
+                    self._high = 0
+                    if self._collect:
+                        for c in chr(code).encode():
+                            self._add(c)
+
+    def _add(self, b):
+        if not self._collect:
+            return
+        if self._length < MAX_STRING:
+            self._text[self._length] = b
+            self._length += 1
+        else:
+            self._truncated = True
+
+    def _open(self, kind):
+        depth = len(self._stack)
+        self._stack.append(kind)
+        self._expect_key = kind == _OBJECT
+        if depth == 2 and kind == _OBJECT and self._top_key == _PEOPLE and self._stack[1] == _ARRAY:
+            self._person = {}
+            self._person_key = None
+
+    def _close(self):
+        if not self._stack:
+            return
+        self._stack.pop()
+        depth = len(self._stack)
+        if depth == 2 and self._person is not None:
+            if len(self.people) < MAX_PEOPLE:
+                self.people.append(self._person)
+            self._person = None
+        elif depth == 1:
+            self._top_key = None
+        self._expect_key = False
+
+    def _begin_string(self):
+        self._state = _STRING
+        self._length = 0
+        self._truncated = False
+        depth = len(self._stack)
+        self._is_key = self._expect_key
+        if self._is_key:
+            self._collect = depth == 1 or (depth == 3 and self._person is not None)
+        else:
+            self._collect = (self._person is not None and depth == 3
+                             and self._person_key in (_NAME, _CRAFT))
+
+    def _end_string(self):
+        if not self._collect:
+            if self._is_key:
+                self._set_key(None)
+            return
+        self._collect = False
+        if self._is_key:
+            key = None
+            if not self._truncated and self._length <= 6:
+                key = _KEYS.get(bytes(self._view[:self._length]))
+            self._set_key(key)
+            return
+        value = self._string()
+        if self._person_key == _CRAFT:
+            # One str per craft, however many people are on it
+            value = self._crafts.setdefault(value, value)
+            self._person['craft'] = value
+        else:
+            self._person['name'] = value
+
+    def _set_key(self, key):
+        depth = len(self._stack)
+        if depth == 1:
+            self._top_key = key
+        elif depth == 3:
+            self._person_key = key
+
+    def _string(self):
+        n = self._length
+        if self._truncated:
+            # Drop a UTF-8 sequence cut off at the end
+            i = n
+            while i > 0 and self._text[i - 1] & 0xC0 == 0x80:
+                i -= 1
+            if i > 0 and self._text[i - 1] >= 0xC0:
+                lead = self._text[i - 1]
+                size = 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+                if n - (i - 1) < size:
+                    n = i - 1
+        return str(self._view[:n], 'utf-8')
+
+    def _end_scalar(self):
+        if self._collect:
+            self._collect = False
+            try:
+                self.number = int(str(self._view[:self._length], 'utf-8'))
+            except ValueError:
+                pass
+
+    def result(self):
+        """The extracted data, or None when number never came"""
+        if self.number is None:
+            return None
+        return {'number': self.number, 'people': self.people}
+
+def load(response, chunk_size=CHUNK_SIZE):
+    """Extract from a streamed urequests response, reading it to the end"""
+    extractor = Extractor()
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    while True:
+        n = response.readinto(buf)
+        if not n:
+            break
+        extractor.feed(view[:n])
+    return extractor.result()
+
+async def load_async(response, chunk_size=CHUNK_SIZE):
+    """Extract from a urequests_async response, reading it to the end"""
+    extractor = Extractor()
+    while True:
+        data = await response.read(chunk_size)
+        if not data:
+            break
+        extractor.feed(data)
+    return extractor.result()
@@ -0,0 +1,154 @@
+"""Proportional bitmap fonts streamed from flash
+
+A font is a packed file built by tools/build_font.py: a small header, an
+index of (code point, offset) pairs sorted by code point, then the glyph
+bitmaps. Nothing is loaded up front. A glyph is found by a binary search
+over the index with seek()/readinto() into a 4-byte scratch buffer, read
+into its own small bitmap and kept in an LRU cache, so a font with
+hundreds of glyphs only costs the few glyphs in use.
+
+Text is composed into a landscape strip and drawn with a single blit(), so
+it works on PortraitCanvas (one rotation per line) as well as on a plain
+FrameBuffer.
+"""
+import framebuf
+import struct
+
+HEADER = '<2sBBBxH'
+HEADER_SIZE = 8
+ENTRY = '<HH'
+ENTRY_SIZE = 4
+
+# Glyph drawn for characters the font does not have
+FALLBACK = 0xFFFD
+
+# Glyphs kept in RAM per font
+GLYPH_CACHE_SIZE = 32
+
+# Shared scratch the text is composed in, grown to the longest line seen
+_strip = bytearray(0)
+
+class Font:
+    def __init__(self, path, cache_size=GLYPH_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._entry = bytearray(ENTRY_SIZE)
+        self._glyph_head = memoryview(self._entry)[:2]
+        with open(path, 'rb') as f:
+            magic, version, height, top, count = struct.unpack(HEADER, f.read(HEADER_SIZE))
+        if magic != b'PF' or version != 1:
+            raise ValueError('not a font file: ' + path)
+        self.height = height
+        # Rows above the capitals; text at y has its capitals start at y
+        self.top = top
+        self.count = count
+        # Code point -> (advance, (buffer, width, height, format)), LRU order
+        self._glyphs = {}
+        self._order = []
+        self._file = None
+
+    def _find(self, code):
+        """Offset of the glyph for code, or None"""
+        f = self._file
+        lo = 0
+        hi = self.count - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            f.seek(HEADER_SIZE + mid * ENTRY_SIZE)
+            f.readinto(self._entry)
+            found, offset = struct.unpack(ENTRY, self._entry)
+            if found == code:
+                return offset
+            if found < code:
+                lo = mid + 1
+            else:
+                hi = mid - 1
+        return None
+
+    def _load(self, code):
+        if self._file is None:
+            self._file = open(self.path, 'rb')
+        offset = self._find(code)
+        if offset is None:
+            offset = self._find(FALLBACK)
+        f = self._file
+        f.seek(offset)
+        f.readinto(self._glyph_head)
+        width = self._entry[0]
+        advance = self._entry[1]
+        buf = bytearray((width + 7) // 8 * self.height)
+        f.readinto(buf)
+        # Stored with ink 1; drawn as ink 0 on background 1, the key colour
+        for i in range(len(buf)):
+            buf[i] ^= 0xff
+        return advance, (buf, width, self.height, framebuf.MONO_HLSB)
+
+    def glyph(self, ch):
+        """(advance, blit source) for ch"""
+        code = ord(ch)
+        g = self._glyphs.get(code)
+        if g is not None:
+            if self._order[-1] != code:
+                self._order.remove(code)
+                self._order.append(code)
+            return g
+        g = self._load(code)
+        if len(self._order) >= self.cache_size:
+            del self._glyphs[self._order.pop(0)]
+        self._glyphs[code] = g
+        self._order.append(code)
+        return g
+
+    def close(self):
+        """Close the font file until the next cache miss (call after a render)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def text_width(self, s):
+        width = 0
+        advance = 0
+        for ch in s:
+            advance, g = self.glyph(ch)
+            width += advance
+        # The last glyph's width, not its advance, ends the text
+        return width - advance + g[1] if s else 0
+
+    def text_extent(self, s):
+        """(left, width) of s drawn at x = 0, like layout.text_extent()"""
+        return 0, self.text_width(s)
+
+    def text(self, surface, s, x, y, c=0):
+        """Draw s with its capitals starting at y; transparent like framebuf.text()"""
+        global _strip
+        width = self.text_width(s)
+        if not width:
+            return
+        w = (width + 7) & ~7
+        h = (self.height + 7) & ~7
+        size = w * h // 8
+        if len(_strip) < size:
+            _strip = bytearray(size)
+        buf = memoryview(_strip)[:size]
+        strip = framebuf.FrameBuffer(buf, w, h, framebuf.MONO_HLSB)
+        strip.fill(1)
+        pen = 0
+        for ch in s:
+            advance, g = self.glyph(ch)
+            if g[1]:
+                strip.blit(g, pen, 0, 1)
+            pen += advance
+        key = 1
+        if c:
+            for i in range(size):
+                buf[i] ^= 0xff
+            key = 0
+        surface.blit((buf, w, h, framebuf.MONO_HLSB), x, y - self.top, key)
+
+def load(path):
+    """Font at path, or None (and a message) when it cannot be read"""
+    try:
+        return Font(path)
+    except (OSError, ValueError) as e:
+        print('Font not available, using the built-in one:', e)
+        return None
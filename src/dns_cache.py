@@ -0,0 +1,73 @@
+"""Host name lookups cached for urequests and ntptime
+
+On the Pico a getaddrinfo() is a blocking round trip to the resolver that
+stalls the main loop, and the same few hosts are looked up on every poll.
+Addresses are kept for TTL seconds; lwIP does not hand out the record's
+own TTL, so it is a fixed one. When a lookup of an expired entry fails the
+old address is served, and the resolver is left alone for RETRY seconds
+before the next try, so an outage does not cost a timeout per request.
+warm() resolves the known hosts at boot, while nothing is waiting yet.
+"""
+import socket
+import utime
+
+# Seconds a resolved address is used before it is looked up again
+TTL = 300
+# Seconds a stale address is served after a failed lookup before retrying
+RETRY = 30
+
+class DnsCache:
+    def __init__(self, ttl=TTL, retry=RETRY):
+        self.ttl = ttl
+        self.retry = retry
+        # (host, port) -> [address, ticks_ms until which it is used]
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.failures = 0
+
+    def getaddr(self, host, port):
+        """Socket address for host and port, looked up when not cached"""
+        key = (host, port)
+        entry = self._entries.get(key)
+        now = utime.ticks_ms()
+        if entry is not None and utime.ticks_diff(entry[1], now) > 0:
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        try:
+            addr = socket.getaddrinfo(host, port)[0][-1]
+        except OSError:
+            self.failures += 1
+            if entry is None:
+                raise
+            self.stale += 1
+            entry[1] = utime.ticks_add(now, self.retry * 1000)
+            return entry[0]
+        self._entries[key] = [addr, utime.ticks_add(now, self.ttl * 1000)]
+        return addr
+
+    def warm(self, hosts):
+        """Look up (host, port) pairs ahead of their first use"""
+        for host, port in hosts:
+            try:
+                self.getaddr(host, port)
+            except OSError as e:
+                print('Could not resolve', host, e)
+
+    def summary(self):
+        return 'DNS cache: {} hits, {} misses, {} stale, {} failures'.format(
+            self.hits, self.misses, self.stale, self.failures)
+
+# Shared by everything that connects out
+CACHE = DnsCache()
+
+def getaddr(host, port):
+    return CACHE.getaddr(host, port)
+
+def resolve(host, port):
+    """Cached IP address of host as a str, for calls that take a host name"""
+    addr = CACHE.getaddr(host, port)
+    # Some ports give a packed sockaddr: leave the lookup to the caller
+    return addr[0] if isinstance(addr, tuple) else host
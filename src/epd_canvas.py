@@ -0,0 +1,87 @@
+"""Landscape drawing surface backed by a portrait hardware plane
+
+The panel is 128x296 portrait but the layouts are drawn in 296x128
+landscape. PortraitCanvas takes landscape coordinates and draws straight
+into the portrait buffer that is sent to the controller, so there is no
+separate landscape buffer and no rotation pass before a refresh.
+
+Landscape pixel (x, y) is portrait pixel (y, hw_height - 1 - x).
+"""
+import framebuf
+import epd_rotate
+
+# Scratch used to turn framebuf.text() output on its side. Shared by all
+# canvases and allocated on first use (2 x hw_height bytes).
+_strip = None
+_strip_fb = None
+_strip_rot = None
+_strip_rot_fb = None
+
+# Scratch for rotating blit() sources, grown to the largest source seen
+_blit_rot = bytearray(0)
+
+def _text_strip(length):
+    global _strip, _strip_fb, _strip_rot, _strip_rot_fb
+    if _strip is None or len(_strip) < length:
+        _strip = bytearray(length)
+        _strip_fb = framebuf.FrameBuffer(_strip, length, 8, framebuf.MONO_HLSB)
+        _strip_rot = bytearray(length)
+        _strip_rot_fb = framebuf.FrameBuffer(_strip_rot, 8, length, framebuf.MONO_HLSB)
+    return _strip_fb
+
+class PortraitCanvas:
+    def __init__(self, buffer, hw_width, hw_height):
+        self.buffer = buffer
+        self.hw_width = hw_width
+        self.hw_height = hw_height
+        # Logical dimensions (landscape)
+        self.width = hw_height
+        self.height = hw_width
+        self.fb = framebuf.FrameBuffer(buffer, hw_width, hw_height, framebuf.MONO_HLSB)
+
+    def fill(self, c):
+        self.fb.fill(c)
+
+    def pixel(self, x, y, c=None):
+        if c is None:
+            return self.fb.pixel(y, self.hw_height - 1 - x)
+        self.fb.pixel(y, self.hw_height - 1 - x, c)
+
+    def hline(self, x, y, w, c):
+        self.fb.vline(y, self.hw_height - x - w, w, c)
+
+    def vline(self, x, y, h, c):
+        self.fb.hline(y, self.hw_height - 1 - x, h, c)
+
+    def rect(self, x, y, w, h, c):
+        self.fb.rect(y, self.hw_height - x - w, h, w, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        self.fb.fill_rect(y, self.hw_height - x - w, h, w, c)
+
+    def text(self, s, x, y, c=1):
+        """Draw 8x8 text; transparent like framebuf.text()"""
+        length = self.hw_height
+        strip = _text_strip(length)
+        # Everything that is not text is the key colour and skipped by blit
+        key = 0 if c else 1
+        strip.fill(key)
+        strip.text(s, 0, 0, c)
+        epd_rotate.rotate_plane(_strip, _strip_rot, length, 8)
+        # Strip pixel (x', r) is rotated pixel (r, length - 1 - x')
+        self.fb.blit(_strip_rot_fb, y, self.hw_height - length - x, key)
+
+    def blit(self, src, x, y, key=-1):
+        """Blit a landscape MONO_HLSB source given as (buffer, width, height, format)
+
+        Width and height of the source must be multiples of 8.
+        """
+        global _blit_rot
+        buf, w, h = src[0], src[1], src[2]
+        size = w * h // 8
+        if len(_blit_rot) < size:
+            _blit_rot = bytearray(size)
+        rot = memoryview(_blit_rot)[:size]
+        epd_rotate.rotate_plane(buf, rot, w, h)
+        rot_fb = framebuf.FrameBuffer(rot, h, w, framebuf.MONO_HLSB)
+        self.fb.blit(rot_fb, y, self.hw_height - x - w, key)
@@ -0,0 +1,81 @@
+"""90 degree rotation of MONO_HLSB planes from landscape to portrait
+
+Landscape pixel (x, y) lands on portrait pixel (y, width - 1 - x), the same
+mapping the drivers used to apply one framebuf.pixel() call at a time.
+
+Instead of touching pixels the planes are walked in 8x8 blocks: the eight
+landscape bytes stacked in one block column transpose into eight portrait
+bytes. Width and height must be multiples of 8 (296x128 is).
+
+With a native emitter the transpose runs in epd_rotate_viper; otherwise a
+pure-Python version driven by lookup tables is used.
+"""
+
+# Pure-Python transpose: a table maps a landscape byte onto a group of output
+# columns, one bit per 8-bit lane. Shifting each row's lookup by its row
+# position and OR-ing them builds whole portrait bytes at once. Lanes are
+# grouped 3 + 3 + 2 so every value stays a MicroPython small int (30 bits)
+# and the loop does not allocate.
+_LANES = ((0, 3), (3, 3), (6, 2))
+
+def _spread_table(first, count):
+    table = []
+    for value in range(256):
+        word = 0
+        for lane in range(count):
+            if value & (0x80 >> (first + lane)):
+                word |= 1 << (8 * lane)
+        table.append(word)
+    return tuple(table)
+
+_TABLES = tuple((first, count, _spread_table(first, count)) for first, count in _LANES)
+
+def _rotate_planes_lut(srcs, dsts, width, height):
+    src_stride = width >> 3
+    dst_stride = height >> 3
+    planes = tuple(zip(srcs, dsts))
+    for by in range(dst_stride):
+        row = by * 8 * src_stride
+        for bx in range(src_stride):
+            i = row + bx
+            # Portrait row holding landscape column 8 * bx
+            o = (width - 1 - 8 * bx) * dst_stride + by
+            for src, dst in planes:
+                b0 = src[i]
+                b1 = src[i + src_stride]
+                b2 = src[i + 2 * src_stride]
+                b3 = src[i + 3 * src_stride]
+                b4 = src[i + 4 * src_stride]
+                b5 = src[i + 5 * src_stride]
+                b6 = src[i + 6 * src_stride]
+                b7 = src[i + 7 * src_stride]
+                for first, count, t in _TABLES:
+                    acc = ((t[b0] << 7) | (t[b1] << 6) | (t[b2] << 5) | (t[b3] << 4) |
+                           (t[b4] << 3) | (t[b5] << 2) | (t[b6] << 1) | t[b7])
+                    j = o - first * dst_stride
+                    for lane in range(count):
+                        dst[j] = (acc >> (8 * lane)) & 0xff
+                        j -= dst_stride
+
+try:
+    from epd_rotate_viper import rotate_planes as _rotate_planes_native
+    ENGINE = 'viper'
+except (ImportError, SyntaxError):
+    _rotate_planes_native = None
+    ENGINE = 'lut'
+
+def rotate_planes(srcs, dsts, width, height):
+    """Rotate landscape planes (width x height) into portrait planes.
+
+    srcs and dsts are sequences of buffers (one or two planes, e.g. black and
+    red), rotated together in a single pass over the blocks. Every
+    destination byte is written, so dsts need not be cleared first.
+    """
+    if _rotate_planes_native is not None:
+        _rotate_planes_native(tuple(srcs), tuple(dsts), width, height)
+    else:
+        _rotate_planes_lut(srcs, dsts, width, height)
+
+def rotate_plane(src, dst, width, height):
+    """Rotate a single landscape plane into a portrait plane"""
+    rotate_planes((src,), (dst,), width, height)
@@ -0,0 +1,62 @@
+"""Native 8x8 block rotation for epd_rotate (needs the viper emitter)
+
+Kept in its own module so ports without a native emitter fail the import
+and epd_rotate falls back to its lookup-table version.
+"""
+import micropython
+
+@micropython.viper
+def rotate_planes(srcs, dsts, width: int, height: int):
+    """Rotate one or two landscape planes in a single pass over the blocks"""
+    planes = int(len(srcs))
+    s0 = ptr8(srcs[0])
+    d0 = ptr8(dsts[0])
+    s1 = ptr8(srcs[planes - 1])
+    d1 = ptr8(dsts[planes - 1])
+    src_stride = width >> 3
+    dst_stride = height >> 3
+    m1 = uint(0x00AA00AA)
+    m2 = uint(0x0000CCCC)
+    m4 = uint(0x0F0F0F0F)
+    m4h = m4 << 4
+    by = 0
+    while by < dst_stride:
+        row = by * 8 * src_stride
+        bx = 0
+        while bx < src_stride:
+            i = row + bx
+            o = (width - 1 - 8 * bx) * dst_stride + by
+            p = 0
+            while p < planes:
+                s = s0
+                d = d0
+                if p:
+                    s = s1
+                    d = d1
+                # Hacker's Delight transpose8 on two 32-bit halves
+                x = ((uint(s[i]) << 24) | (uint(s[i + src_stride]) << 16) |
+                     (uint(s[i + 2 * src_stride]) << 8) | uint(s[i + 3 * src_stride]))
+                y = ((uint(s[i + 4 * src_stride]) << 24) | (uint(s[i + 5 * src_stride]) << 16) |
+                     (uint(s[i + 6 * src_stride]) << 8) | uint(s[i + 7 * src_stride]))
+                t = (x ^ (x >> 7)) & m1
+                x = x ^ t ^ (t << 7)
+                t = (y ^ (y >> 7)) & m1
+                y = y ^ t ^ (t << 7)
+                t = (x ^ (x >> 14)) & m2
+                x = x ^ t ^ (t << 14)
+                t = (y ^ (y >> 14)) & m2
+                y = y ^ t ^ (t << 14)
+                t = (x & m4h) | ((y >> 4) & m4)
+                y = ((x << 4) & m4h) | (y & m4)
+                x = t
+                d[o] = int(x >> 24)
+                d[o - dst_stride] = int(x >> 16)
+                d[o - 2 * dst_stride] = int(x >> 8)
+                d[o - 3 * dst_stride] = int(x)
+                d[o - 4 * dst_stride] = int(y >> 24)
+                d[o - 5 * dst_stride] = int(y >> 16)
+                d[o - 6 * dst_stride] = int(y >> 8)
+                d[o - 7 * dst_stride] = int(y)
+                p += 1
+            bx += 1
+        by += 1
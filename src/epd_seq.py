@@ -0,0 +1,52 @@
+"""Command sequences for the e-paper controllers as precompiled tables
+
+A panel's init, LUT upload and sleep sequences are written as a list of
+steps and compiled once, at import, into a table of entries:
+
+    (command, flags, data, wait)
+
+data is a bytes object built at compile time (None for no data), so
+run() hands it to the driver as-is. The command goes out through the
+driver's reused one-byte buffer and all of its data in a single CS-low
+write, instead of one send_data() call (and CS toggle) per byte. Walking
+the table allocates nothing. Supporting another panel variant is a
+matter of writing its tables.
+"""
+
+# wait of a step that waits for the BUSY pin; no delay can be negative
+BUSY    = -1
+
+# Entry flags
+WAIT_BUSY   = 0x01
+WAIT_DELAY  = 0x02
+
+def compile(steps):
+    """Table for steps of (command, data) or (command, data, wait)
+
+    wait is BUSY or a delay in ms (a positive int).
+    """
+    table = []
+    for step in steps:
+        command, data = step[0], bytes(step[1])
+        wait = step[2] if len(step) > 2 else 0
+        if wait == BUSY:
+            flags = WAIT_BUSY
+        elif not isinstance(wait, int) or wait < 0:
+            raise ValueError('bad wait for command 0x{:02x}: {}'.format(command, wait))
+        elif wait:
+            flags = WAIT_DELAY
+        else:
+            flags = 0
+        table.append((command, flags, data or None, wait))
+    return tuple(table)
+
+def run(epd, table):
+    """Send a compiled table with epd's send_command()/send_data1()"""
+    for command, flags, data, wait in table:
+        epd.send_command(command)
+        if data is not None:
+            epd.send_data1(data)
+        if flags & WAIT_DELAY:
+            epd.delay_ms(wait)
+        if flags & WAIT_BUSY:
+            epd.ReadBusy()
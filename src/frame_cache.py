@@ -0,0 +1,91 @@
+"""Rendered frames kept in flash, keyed by a digest of the crew manifest
+
+Each frame is stored as one raw file per plane, so a cached frame is read
+straight into the frame buffers with readinto() and does not have to be
+rendered again, even after a reboot. An index file lists the cached keys,
+most recent first; a frame only counts as cached once it is in the index.
+
+Every file is written to a temporary name and renamed into place, so a
+power cut leaves either the old file or the complete new one.
+"""
+import os
+
+def write_atomic(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        # Filesystems that cannot rename over an existing file
+        os.remove(path)
+        os.rename(tmp, path)
+
+class FrameCache:
+    def __init__(self, prefix, size=4):
+        self.prefix = prefix
+        self.size = size
+        self.index_file = prefix + '.idx'
+        # Cached keys, most recent first; None until the index is read
+        self.keys = None
+
+    def _plane_file(self, key, plane):
+        return '{}_{}.{}'.format(self.prefix, key, plane)
+
+    def _read_index(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                self.keys = f.read().split()
+        except OSError:
+            self.keys = []
+
+    def cached(self):
+        """Keys of the cached frames, most recent first"""
+        if self.keys is None:
+            self._read_index()
+        return list(self.keys)
+
+    def load(self, key, planes):
+        """Fill the plane buffers with the frame cached under key
+
+        Returns False (buffers undefined) when the frame is not cached.
+        """
+        if self.keys is None:
+            self._read_index()
+        if key not in self.keys:
+            return False
+        try:
+            for i, buf in enumerate(planes):
+                with open(self._plane_file(key, i), 'rb') as f:
+                    if f.readinto(buf) != len(buf):
+                        return False
+        except OSError:
+            return False
+        # Recency is only tracked in RAM; the index is written on store
+        self.keys.remove(key)
+        self.keys.insert(0, key)
+        return True
+
+    def store(self, key, planes):
+        """Cache the plane buffers under key, dropping the oldest frame"""
+        if self.keys is None:
+            self._read_index()
+        if key in self.keys:
+            return
+        try:
+            for i, buf in enumerate(planes):
+                write_atomic(self._plane_file(key, i), buf)
+            keys = [key] + self.keys
+            evicted = keys[self.size:]
+            del keys[self.size:]
+            write_atomic(self.index_file, '\n'.join(keys).encode())
+            self.keys = keys
+        except OSError as e:
+            print('Could not cache frame:', e)
+            return
+        for old in evicted:
+            for i in range(len(planes)):
+                try:
+                    os.remove(self._plane_file(old, i))
+                except OSError:
+                    pass
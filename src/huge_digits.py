@@ -0,0 +1,81 @@
+"""Huge 7-segment style digits for the headcount
+
+Each glyph is rasterised the first time it is used into a packed MONO_HLSB
+bitmap and kept at module level, so drawing a number is a single blit per
+digit. Glyphs come in several heights, scaled from the same segment table,
+so wider numbers can drop to a smaller size and still fit.
+"""
+import framebuf
+
+# Segment rectangles (x, y, w, h) of the 30x50 base glyph
+SEGMENTS = {
+    '0': ((0,0,30,8), (0,0,8,50), (22,0,8,50), (0,42,30,8)),
+    '1': ((22,0,8,50),),
+    '2': ((0,0,30,8), (22,0,8,25), (0,21,30,8), (0,25,8,25), (0,42,30,8)),
+    '3': ((0,0,30,8), (22,0,8,25), (0,21,30,8), (22,25,8,25), (0,42,30,8)),
+    '4': ((0,0,8,25), (22,0,8,50), (0,21,30,8)),
+    '5': ((0,0,30,8), (0,0,8,25), (0,21,30,8), (22,25,8,25), (0,42,30,8)),
+    '6': ((0,0,30,8), (0,0,8,50), (0,21,30,8), (22,25,8,25), (0,42,30,8)),
+    '7': ((0,0,30,8), (22,0,8,50)),
+    '8': ((0,0,30,8), (0,0,8,50), (22,0,8,50), (0,21,30,8), (0,42,30,8)),
+    '9': ((0,0,30,8), (0,0,8,25), (22,0,8,50), (0,21,30,8), (0,42,30,8)),
+}
+BASE_WIDTH = 30
+BASE_HEIGHT = 50
+BASE_PITCH = 35
+
+# Glyph heights draw_huge_number can pick from, largest first
+SIZES = (50, 40, 30)
+
+# (digit, height) -> (buffer, width, height, format), widths padded to 8
+_glyphs = {}
+
+def _scale(value, height):
+    return (value * height + BASE_HEIGHT // 2) // BASE_HEIGHT
+
+def pitch(height=BASE_HEIGHT):
+    """Horizontal distance between digits of the given height"""
+    return _scale(BASE_PITCH, height)
+
+def glyph(digit, height=BASE_HEIGHT):
+    """Bitmap for digit: ink is 0, background 1"""
+    key = (digit, height)
+    g = _glyphs.get(key)
+    if g is None:
+        w = (_scale(BASE_WIDTH, height) + 7) & ~7
+        h = (height + 7) & ~7
+        buf = bytearray(w * h // 8)
+        fb = framebuf.FrameBuffer(buf, w, h, framebuf.MONO_HLSB)
+        fb.fill(1)
+        for x, y, sw, sh in SEGMENTS[digit]:
+            # Scale both edges so neighbouring segments still meet
+            x0 = _scale(x, height)
+            y0 = _scale(y, height)
+            fb.fill_rect(x0, y0, _scale(x + sw, height) - x0, _scale(y + sh, height) - y0, 0)
+        g = (buf, w, h, framebuf.MONO_HLSB)
+        _glyphs[key] = g
+    return g
+
+def fit_height(num_str, max_width):
+    """Largest glyph height at which num_str fits in max_width"""
+    for height in SIZES:
+        if len(num_str) * pitch(height) <= max_width:
+            return height
+    return SIZES[-1]
+
+def draw_huge_number(target, number, center_x, y, height=BASE_HEIGHT, max_width=None):
+    """Blit number centered at center_x on any surface with blit()
+
+    With max_width the height is reduced to the largest size that fits.
+    Returns the glyph height used.
+    """
+    num_str = str(number)
+    if max_width is not None:
+        height = min(height, fit_height(num_str, max_width))
+    digit_pitch = pitch(height)
+    x = center_x - (len(num_str) * digit_pitch) // 2
+    for digit in num_str:
+        if digit in SEGMENTS:
+            target.blit(glyph(digit, height), x, y, 1)
+        x += digit_pitch
+    return height
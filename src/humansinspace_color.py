@@ -1,11 +1,24 @@
-import urequests
-import ujson
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+import astros_json
+import api_cache
+import sources
 from machine import Pin, SPI
-import framebuf
 import utime
+import binascii
+import os
 import webserver
-
-# Hardware is 128x296 (portrait), draw landscape and rotate
+import epd_canvas
+import huge_digits
+import layers
+import layout
+import frame_cache
+import bitmap_font
+import epd_seq
+
+# Hardware is 128x296 (portrait), draw landscape straight into portrait buffers
 EPD_WIDTH       = 128
 EPD_HEIGHT      = 296
 
@@ -14,6 +27,73 @@ DC_PIN          = 8
 CS_PIN          = 9
 BUSY_PIN        = 13
 
+# Controller sequences, compiled once (see epd_seq)
+SEQ_INIT = epd_seq.compile((
+    (0x06, b'\x17\x17\x17'),                # booster soft start
+    (0x04, b'', epd_seq.BUSY),              # power on
+    (0x00, b'\x8f'),                        # panel setting
+    (0x50, b'\x77'),                        # VCOM and data interval
+    (0x61, bytes((EPD_WIDTH, EPD_HEIGHT >> 8, EPD_HEIGHT & 0xff))),    # resolution
+))
+SEQ_SLEEP = epd_seq.compile((
+    (0x02, b'', epd_seq.BUSY),              # power off
+    (0x07, b'\xa5'),                        # deep sleep
+))
+
+# Bytes per SPI write when streaming a constant fill (divides 296 * 16)
+FILL_CHUNK      = 128
+
+# Digest of the frame currently on the panel, kept across reboots
+FRAME_DIGEST_FILE = 'last_frame.txt'
+
+# Full-screen clear before a refresh every this many refreshes, against ghosting
+CLEAR_EVERY     = 50
+
+# Bump whenever the layout changes, so frames cached in flash are redrawn
+LAYOUT_VERSION = 4
+
+# Captions, background and spacecraft header, cached in flash between updates
+STATIC_LAYER = layers.StaticLayer('layer_static')
+
+# Last few complete frames (both planes), keyed by frame_key()
+FRAME_CACHE_SIZE = 4
+FRAME_CACHE = frame_cache.FrameCache('frame', FRAME_CACHE_SIZE)
+
+# Validators and data of the last good API response, for conditional GETs
+API_URL = 'http://api.open-notify.org/astros.json'
+API_CACHE = api_cache.ApiCache('api_cache.json')
+# Where the data can come from; main.py applies the api_sources setting
+API_SOURCES = sources.Sources([API_URL])
+
+# Time in deep sleep before the reset line is pulled low
+SLEEP_SETTLE_MS = 2000
+
+# Controller power states
+POWER_OFF       = 0     # never initialised since boot
+POWER_AWAKE     = 1
+POWER_ASLEEP    = 2     # deep sleep, needs a reset to wake
+
+# SpaceDisplay refresh states
+DISPLAY_IDLE        = 0
+DISPLAY_REFRESHING  = 1     # waiting for BUSY
+DISPLAY_SETTLING    = 2     # in deep sleep, waiting to release the reset line
+
+class Frame:
+    """One frame slot: portrait black and red planes and their landscape surfaces"""
+    def __init__(self, hw_width=EPD_WIDTH, hw_height=EPD_HEIGHT):
+        self.width = hw_height
+        self.height = hw_width
+        # Hardware buffers (portrait), sent to the panel as-is
+        self.buffer_black = bytearray(hw_height * hw_width // 8)
+        self.buffer_red = bytearray(hw_height * hw_width // 8)
+        # Landscape drawing surfaces writing into the hardware buffers
+        self.imageblack = epd_canvas.PortraitCanvas(self.buffer_black, hw_width, hw_height)
+        self.imagered = epd_canvas.PortraitCanvas(self.buffer_red, hw_width, hw_height)
+
+    def digest(self):
+        """CRC32 over the black and red planes"""
+        return binascii.crc32(self.buffer_red, binascii.crc32(self.buffer_black))
+
 class EPD_2IN9_C_Landscape:
     def __init__(self):
         self.reset_pin = Pin(RST_PIN, Pin.OUT)
@@ -31,17 +111,25 @@ class EPD_2IN9_C_Landscape:
         self.spi.init(baudrate=4000_000)
         self.dc_pin = Pin(DC_PIN, Pin.OUT)
 
-        # Create hardware buffers (portrait)
-        self.hw_buffer_black = bytearray(self.hw_height * self.hw_width // 8)
-        self.hw_buffer_red = bytearray(self.hw_height * self.hw_width // 8)
+        # Preallocated transfer buffers so a refresh does not touch the heap
+        self.byte_buffer = bytearray(1)
+        self.fill_chunk = bytearray(FILL_CHUNK)
+
+        # The driver's own frame; start_display() can also send another one
+        self.frame = Frame(self.hw_width, self.hw_height)
+        self.buffer_black = self.frame.buffer_black
+        self.buffer_red = self.frame.buffer_red
+        self.imageblack = self.frame.imageblack
+        self.imagered = self.frame.imagered
 
-        # Create landscape framebuffers for drawing
-        self.buffer_black = bytearray(self.height * self.width // 8)
-        self.buffer_red = bytearray(self.height * self.width // 8)
-        self.imageblack = framebuf.FrameBuffer(self.buffer_black, self.width, self.height, framebuf.MONO_HLSB)
-        self.imagered = framebuf.FrameBuffer(self.buffer_red, self.width, self.height, framebuf.MONO_HLSB)
+        # The controller is powered up on the first transfer, see wake()
+        self.power_state = POWER_OFF
 
-        self.init()
+        # Refresh in progress, see TurnOnDisplay() / refresh_done()
+        self.refreshing = False
+        self.busy_since = 0
+        self.last_busy_ms = None
+        self.refresh_digest = None
 
     def digital_write(self, pin, value):
         pin.value(value)
@@ -50,10 +138,11 @@ class EPD_2IN9_C_Landscape:
         return pin.value()
 
     def delay_ms(self, delaytime):
-        utime.sleep(delaytime / 1000.0)
+        utime.sleep_ms(delaytime)
 
     def spi_writebyte(self, data):
-        self.spi.write(bytearray(data))
+        self.byte_buffer[0] = data
+        self.spi.write(self.byte_buffer)
 
     def module_exit(self):
         self.digital_write(self.reset_pin, 0)
@@ -69,19 +158,34 @@ class EPD_2IN9_C_Landscape:
     def send_command(self, command):
         self.digital_write(self.dc_pin, 0)
         self.digital_write(self.cs_pin, 0)
-        self.spi_writebyte([command])
+        self.spi_writebyte(command)
         self.digital_write(self.cs_pin, 1)
 
     def send_data(self, data):
         self.digital_write(self.dc_pin, 1)
         self.digital_write(self.cs_pin, 0)
-        self.spi_writebyte([data])
+        self.spi_writebyte(data)
         self.digital_write(self.cs_pin, 1)
 
     def send_data1(self, buf):
+        # buf goes out as-is: bytes, bytearray or memoryview, no copy
         self.digital_write(self.dc_pin, 1)
         self.digital_write(self.cs_pin, 0)
-        self.spi.write(bytearray(buf))
+        self.spi.write(buf)
+        self.digital_write(self.cs_pin, 1)
+
+    def send_fill(self, value, count):
+        """Send count copies of value, reusing the preallocated fill chunk"""
+        chunk = self.fill_chunk
+        for i in range(len(chunk)):
+            chunk[i] = value
+        self.digital_write(self.dc_pin, 1)
+        self.digital_write(self.cs_pin, 0)
+        while count >= len(chunk):
+            self.spi.write(chunk)
+            count -= len(chunk)
+        if count:
+            self.spi.write(memoryview(chunk)[:count])
         self.digital_write(self.cs_pin, 1)
 
     def ReadBusy(self):
@@ -92,141 +196,422 @@ class EPD_2IN9_C_Landscape:
             self.delay_ms(10)
         print('busy release')
 
+    def is_busy(self):
+        """Poll BUSY once (low while the controller is working)"""
+        self.send_command(0x71)
+        return self.digital_read(self.busy_pin) == 0
+
     def TurnOnDisplay(self):
+        """Start the refresh and return without waiting for BUSY"""
         self.send_command(0x12)
-        self.ReadBusy()
+        self.refreshing = True
+        self.busy_since = utime.ticks_ms()
+
+    def refresh_done(self):
+        """True once the refresh started by TurnOnDisplay() has finished
+
+        On completion the busy time is kept in last_busy_ms and the digest
+        of the frame now on the panel is saved.
+        """
+        if not self.refreshing:
+            return True
+        if self.is_busy():
+            return False
+        self.refreshing = False
+        self.last_busy_ms = utime.ticks_diff(utime.ticks_ms(), self.busy_since)
+        print(f'busy release after {self.last_busy_ms} ms')
+        save_frame_digest(self.refresh_digest)
+        return True
+
+    def wait_refresh(self):
+        while not self.refresh_done():
+            self.delay_ms(10)
 
     def init(self):
         print('init')
         self.reset()
-        self.send_command(0x06)
-        self.send_data(0x17)
-        self.send_data(0x17)
-        self.send_data(0x17)
-        self.send_command(0x04)
-        self.ReadBusy()
-        self.send_command(0X00)
-        self.send_data(0x8F)
-        self.send_command(0X50)
-        self.send_data(0x77)
-        self.send_command(0x61)
-        self.send_data(0x80)
-        self.send_data(0x01)
-        self.send_data(0x28)
-
-    def rotate_buffer_90(self, src_fb, dst_buffer):
-        """Rotate landscape buffer 90 degrees clockwise to portrait"""
-        dst_fb = framebuf.FrameBuffer(dst_buffer, self.hw_width, self.hw_height, framebuf.MONO_HLSB)
-        dst_fb.fill(0xff)
-
-        for y in range(self.height):  # 0-127
-            for x in range(self.width):  # 0-295
-                pixel = src_fb.pixel(x, y)
-                dst_fb.pixel(y, self.hw_height - 1 - x, pixel)
+        epd_seq.run(self, SEQ_INIT)
+        self.power_state = POWER_AWAKE
+
+    def wake(self):
+        """Power the controller up if it is off or in deep sleep
+
+        Deep sleep can only be left through a hardware reset, which also
+        clears the registers, so waking is reset plus the short init()
+        sequence. Buffers, pins and SPI are left untouched.
+        """
+        if self.power_state != POWER_AWAKE:
+            self.init()
+
+    def start_display(self, frame=None):
+        """Send both planes of frame (default: our own) and start the refresh
+
+        Returns without waiting. Once the planes are sent the controller has
+        its own copy, so frame can be drawn into again during the refresh.
+        """
+        if frame is None:
+            frame = self.frame
+        self.wake()
+        self.send_command(0x10)
+        self.send_data1(frame.buffer_black)
+
+        self.send_command(0x13)
+        self.send_data1(frame.buffer_red)
+
+        self.refresh_digest = frame.digest()
+        self.TurnOnDisplay()
 
     def display(self):
-        # Rotate both buffers
-        self.rotate_buffer_90(self.imageblack, self.hw_buffer_black)
-        self.rotate_buffer_90(self.imagered, self.hw_buffer_red)
+        self.start_display()
+        self.wait_refresh()
 
+    def start_clear(self, colorblack, colorred):
+        """Fill both planes and start the refresh, without waiting"""
+        self.wake()
         self.send_command(0x10)
-        self.send_data1(self.hw_buffer_black)
+        self.send_fill(colorblack, self.hw_height * self.hw_width // 8)
 
         self.send_command(0x13)
-        self.send_data1(self.hw_buffer_red)
+        self.send_fill(colorred, self.hw_height * self.hw_width // 8)
 
+        self.refresh_digest = None
         self.TurnOnDisplay()
 
     def Clear(self, colorblack, colorred):
-        self.send_command(0x10)
-        self.send_data1([colorblack] * self.hw_height * int(self.hw_width / 8))
+        self.start_clear(colorblack, colorred)
+        self.wait_refresh()
 
-        self.send_command(0x13)
-        self.send_data1([colorred] * self.hw_height * int(self.hw_width / 8))
+    def start_sleep(self):
+        """Power off and enter deep sleep; module_exit() must follow 2 s later
 
-        self.TurnOnDisplay()
+        Returns False if the controller was not awake.
+        """
+        if self.power_state != POWER_AWAKE:
+            return False
+        epd_seq.run(self, SEQ_SLEEP)
+        self.power_state = POWER_ASLEEP
+        return True
 
     def sleep(self):
-        self.send_command(0X02)
-        self.ReadBusy()
-        self.send_command(0X07)
-        self.send_data(0xA5)
-        self.delay_ms(2000)
-        self.module_exit()
-
-    def draw_huge_digit(self, framebuffer, digit, x, y):
-        """Draw a single large digit on specified framebuffer"""
-        digits = {
-            '0': [(0,0,30,8), (0,0,8,50), (22,0,8,50), (0,42,30,8)],
-            '1': [(22,0,8,50)],
-            '2': [(0,0,30,8), (22,0,8,25), (0,21,30,8), (0,25,8,25), (0,42,30,8)],
-            '3': [(0,0,30,8), (22,0,8,25), (0,21,30,8), (22,25,8,25), (0,42,30,8)],
-            '4': [(0,0,8,25), (22,0,8,50), (0,21,30,8)],
-            '5': [(0,0,30,8), (0,0,8,25), (0,21,30,8), (22,25,8,25), (0,42,30,8)],
-            '6': [(0,0,30,8), (0,0,8,50), (0,21,30,8), (22,25,8,25), (0,42,30,8)],
-            '7': [(0,0,30,8), (22,0,8,50)],
-            '8': [(0,0,30,8), (0,0,8,50), (22,0,8,50), (0,21,30,8), (0,42,30,8)],
-            '9': [(0,0,30,8), (0,0,8,25), (22,0,8,50), (0,21,30,8), (0,42,30,8)],
-        }
-
-        if digit in digits:
-            for rect in digits[digit]:
-                framebuffer.fill_rect(x + rect[0], y + rect[1], rect[2], rect[3], 0x00)
-
-    def draw_huge_number(self, framebuffer, number, center_x, y):
-        """Draw a large number centered at center_x"""
-        num_str = str(number)
-        digit_width = 35
-        total_width = len(num_str) * digit_width
-        start_x = center_x - (total_width // 2)
+        if self.start_sleep():
+            self.delay_ms(SLEEP_SETTLE_MS)
+            self.module_exit()
 
-        for i, digit in enumerate(num_str):
-            self.draw_huge_digit(framebuffer, digit, start_x + (i * digit_width), y)
-
-# API query function with retry
+    def draw_huge_number(self, framebuffer, number, center_x, y, max_width=None):
+        """Draw a large number centered at center_x"""
+        return huge_digits.draw_huge_number(framebuffer, number, center_x, y, max_width=max_width)
+
+def load_frame_digest():
+    """Digest of the frame last sent to the panel, or None"""
+    try:
+        with open(FRAME_DIGEST_FILE, 'r') as f:
+            return int(f.read().strip())
+    except:
+        return None
+
+def save_frame_digest(digest):
+    """Remember the frame on the panel (None when it is unknown)"""
+    try:
+        if digest is None:
+            os.remove(FRAME_DIGEST_FILE)
+        else:
+            with open(FRAME_DIGEST_FILE, 'w') as f:
+                f.write(str(digest))
+    except OSError:
+        pass
+
+# API query function with retry: (data, unchanged), data None on failure
 def query_api(retries=3):
     for attempt in range(retries):
         try:
             print(f"Querying API (attempt {attempt + 1}/{retries})...")
-            url = 'http://api.open-notify.org/astros.json'
-            response = urequests.get(url)
-            if response.status_code == 200:
-                json_data = ujson.loads(response.text)
-                print("API Response:", json_data)
-                return json_data
-            else:
-                print("Failed to get data, status code:", response.status_code)
+            result = API_SOURCES.first(lambda url: API_CACHE.fetch(url, astros_json.load))
+            if result is not None:
+                return result
         except Exception as e:
             print(f"Error querying API (attempt {attempt + 1}): {e}")
             if attempt < retries - 1:
                 print("Retrying in 2 seconds...")
                 utime.sleep(2)
-    return None
-
-def group_by_spacecraft(people_list):
-    """Group people by their spacecraft"""
-    spacecraft_dict = {}
-    for person in people_list:
-        craft = person.get('craft', 'Unknown')
-        if craft not in spacecraft_dict:
-            spacecraft_dict[craft] = []
-        spacecraft_dict[craft].append(person.get('name', 'Unknown'))
-    return spacecraft_dict
+    return None, False
+
+async def query_api_async(retries=3, **timeouts):
+    """query_api() for uasyncio: other tasks run while it waits on the network
+
+    Each attempt asks the healthiest source and hedges with the next one
+    when it is slow (see sources.Sources.fetch()).
+
+    timeouts (connect_timeout, first_byte_timeout, total_timeout) go to
+    urequests_async.get().
+    """
+    for attempt in range(retries):
+        try:
+            print(f"Querying API (attempt {attempt + 1}/{retries})...")
+            result = await API_SOURCES.fetch(
+                lambda url: API_CACHE.fetch_async(url, astros_json.load_async, **timeouts))
+            if result is not None:
+                return result
+        except Exception as e:
+            print(f"Error querying API (attempt {attempt + 1}): {repr(e)}")
+            if attempt < retries - 1:
+                print("Retrying in 2 seconds...")
+                await asyncio.sleep(2)
+    return None, False
 
 def format_timestamp():
     """Format current time as HH:MM"""
     t = utime.localtime()
     return "{:02d}:{:02d}".format(t[3], t[4])
 
-def display_space_info(web_server=None):
-    """Main function to display space information with RED number"""
-
-    # Initialize display
-    epd = EPD_2IN9_C_Landscape()
-    epd.Clear(0xff, 0xff)
+class SpaceDisplay:
+    """Long-lived owner of the e-paper driver
+
+    Create one at boot and pass it to every display_space_info() call: the
+    frame buffers, pins and SPI stay allocated and the controller is only
+    woken from deep sleep when a refresh is actually needed.
+
+    Refreshes run in the background: submit() sends the frame and returns,
+    and poll() - called from the main loop - notices BUSY going high and
+    puts the controller back to sleep, so the web server keeps serving
+    while the panel updates.
+
+    There are two frame slots. front is the frame on (or going to) the
+    panel; back is drawn into and handed over with submit(), so the next
+    frame can be rendered while the previous refresh is still running.
+    A frame submitted during a refresh waits in back and is sent when the
+    refresh ends; submitting again before then replaces it, so a burst of
+    updates collapses into one refresh of the newest frame.
+    """
+    def __init__(self, clear_every=CLEAR_EVERY):
+        self.epd = EPD_2IN9_C_Landscape()
+        self.front = self.epd.frame
+        self.back = Frame()
+        # Digest of the front frame; at boot, of what the panel kept showing
+        self.front_digest = load_frame_digest()
+        # True once front holds that frame: zero-filled buffers are no picture
+        self.front_ready = self.restore_front()
+        # back holds a frame waiting for the current refresh to end
+        self.pending = False
+        self.clear_every = clear_every
+        self.refreshes_since_clear = 0
+        self.state = DISPLAY_IDLE
+        self.frame_pending = False
+        self.settle_until = 0
+        # Busy time of the last refresh in ms, for diagnostics
+        self.last_busy_ms = None
+
+    def restore_front(self):
+        """Read the frame the panel kept showing back into front from FRAME_CACHE"""
+        if self.front_digest is None:
+            return False
+        planes = (self.front.buffer_black, self.front.buffer_red)
+        for key in FRAME_CACHE.cached():
+            if FRAME_CACHE.load(key, planes) and self.front.digest() == self.front_digest:
+                print('Shown frame restored from cache')
+                return True
+        return False
+
+    def frame(self):
+        """The slot to render the next frame into (never the one refreshing)"""
+        return self.back
+
+    def submit(self):
+        """Queue the back frame for the panel
+
+        Starts the refresh now if the panel is idle, otherwise when the
+        current one ends. Returns False if the panel already shows (or is
+        about to show) this frame, in which case nothing is refreshed.
+        """
+        digest = self.back.digest()
+        if digest == self.front_digest:
+            # Same picture: keep it as front so front always holds what
+            # the panel shows, and drop any older frame that was waiting
+            self.front, self.back = self.back, self.front
+            self.front_ready = True
+            self.pending = False
+            return False
+        self.pending = True
+        if self.state == DISPLAY_IDLE:
+            self.start_next()
+        return True
+
+    def start_next(self):
+        """Swap the waiting frame to the front and start its refresh
+
+        A clear is only inserted when the anti-ghosting schedule says so;
+        the frame is then sent by poll() once the clear has finished.
+        """
+        self.front, self.back = self.back, self.front
+        self.front_digest = self.front.digest()
+        self.front_ready = True
+        self.pending = False
+        if self.clear_every and self.refreshes_since_clear >= self.clear_every:
+            print('Clearing panel (anti-ghosting)')
+            self.epd.start_clear(0xff, 0xff)
+            self.refreshes_since_clear = 0
+            self.frame_pending = True
+        else:
+            self.epd.start_display(self.front)
+        self.refreshes_since_clear += 1
+        self.state = DISPLAY_REFRESHING
+
+    def poll(self):
+        """Advance a background refresh; cheap to call when idle"""
+        if self.state == DISPLAY_REFRESHING:
+            if not self.epd.refresh_done():
+                return
+            if self.frame_pending:
+                self.frame_pending = False
+                self.epd.start_display(self.front)
+                return
+            if self.pending:
+                # Controller is still awake: go straight to the newest frame
+                self.state = DISPLAY_IDLE
+                self.start_next()
+                return
+            self.last_busy_ms = self.epd.last_busy_ms
+            self.epd.start_sleep()
+            self.settle_until = utime.ticks_add(utime.ticks_ms(), SLEEP_SETTLE_MS)
+            self.state = DISPLAY_SETTLING
+        elif self.state == DISPLAY_SETTLING:
+            if utime.ticks_diff(self.settle_until, utime.ticks_ms()) <= 0:
+                self.epd.module_exit()
+                self.state = DISPLAY_IDLE
+                if self.pending:
+                    self.start_next()
+
+    def busy(self):
+        return self.state != DISPLAY_IDLE
+
+    def wait(self):
+        """Block until any background refresh (and queued frame) has finished"""
+        while self.busy():
+            self.poll()
+            utime.sleep_ms(10)
+
+    def refresh(self):
+        """Show the back frame and wait until the panel sleeps again"""
+        if self.submit():
+            self.wait()
+
+# Multilingual text at the bottom (fixed position)
+TEXT_BLOCK_HEIGHT = 30  # 3 lines * 10px
+BOTTOM_TEXT_Y = EPD_WIDTH - TEXT_BLOCK_HEIGHT - 3
+CAPTIONS = ("Mensen in de ruimte", "Humans in Space", "Gens dans l'espace")
+
+# Proportional font for the header and captions (None: built-in 8x8 font)
+FONT = bitmap_font.load('font.pf')
+
+# Spacecraft header, wrapped to this many pixels of ink per line
+HEADER_Y        = 5
+HEADER_WIDTH    = 280
+LINE_HEIGHT     = 10
+# Header items are "craft (crew size)"; the size sits in a slot this wide
+# at least, so where the crafts go does not depend on their crew sizes
+COUNT_SLOT      = "(99)"
+COUNT_GAP       = 3     # craft name to its crew size
+ITEM_GAP        = 10    # between header items
+
+# Height of the big number, centred between header and captions
+NUMBER_HEIGHT   = 50
+
+@layout.memoise
+def color_layout(number, crafts):
+    """Draw operations for a view model
+
+    Returns (layer_key, static_ops, count_ops, red_ops). The static ops
+    (craft names and captions) only depend on the craft names and the
+    count slot width, which make up layer_key; the crew sizes are drawn
+    over the cached layer by count_ops.
+    """
+    center_x = EPD_HEIGHT // 2
+    sizes = ["({})".format(size) for craft, size in crafts]
+    slot = layout.text_width(COUNT_SLOT, FONT)
+    for size in sizes:
+        slot = max(slot, layout.text_width(size, FONT))
+    names = [layout.truncate(craft, HEADER_WIDTH - COUNT_GAP - slot, FONT) for craft, size in crafts]
+
+    # Wrap whole items, each a name and its count slot
+    lines = []
+    line = []
+    line_width = 0
+    for i, name in enumerate(names):
+        width = layout.text_width(name, FONT) + COUNT_GAP + slot
+        if line and line_width + ITEM_GAP + width > HEADER_WIDTH:
+            lines.append((line, line_width))
+            line = []
+            line_width = 0
+        line_width += (ITEM_GAP if line else 0) + width
+        line.append(i)
+    if line:
+        lines.append((line, line_width))
+
+    static = []
+    counts = []
+    y = HEADER_Y
+    for line, line_width in lines:
+        x = center_x - line_width // 2
+        for i in line:
+            left, width = layout.text_extent(names[i], FONT)
+            static.append((layout.TEXT, names[i], x - left, y, 0x00))
+            x += width + COUNT_GAP
+            counts.append((layout.TEXT, sizes[i], x - layout.text_extent(sizes[i], FONT)[0], y, 0x00))
+            x += slot + ITEM_GAP
+        y += LINE_HEIGHT
+    for i, caption in enumerate(CAPTIONS):
+        static.append((layout.TEXT, caption, layout.centered_x(caption, center_x, FONT),
+                       BOTTOM_TEXT_Y + i * LINE_HEIGHT, 0x00))
+
+    # Number in the vertical centre between header and captions
+    number_y = y + (BOTTOM_TEXT_Y - y - NUMBER_HEIGHT) // 2
+    red = ((layout.NUMBER, number, center_x, number_y, EPD_HEIGHT),)
+    layer_key = "{}:{}:{}".format(LAYOUT_VERSION, slot, "|".join(names))
+    return layer_key, tuple(static), tuple(counts), red
+
+def draw_static_layer(frame, static_ops):
+    """Draw the black plane's static part: craft names and captions"""
+    # Clear framebuffer (white background)
+    frame.imageblack.fill(0xff)
+    layout.draw(static_ops, frame.imageblack, FONT)
+
+def frame_key(model):
+    """Digest of the crew manifest (view model) and layout version"""
+    return '{:08x}'.format(binascii.crc32(repr((LAYOUT_VERSION, model)).encode()))
+
+def render_frame(frame, model):
+    """Draw the frame for a view model into the buffers of frame"""
+    # Layout is memoised, so a known crew manifest skips it
+    layer_key, static_ops, count_ops, red_ops = color_layout(*model)
+
+    # Static layer: reuse the cached plane while the crafts are unchanged
+    if not STATIC_LAYER.load(layer_key, frame.buffer_black):
+        draw_static_layer(frame, static_ops)
+        STATIC_LAYER.store(layer_key, frame.buffer_black)
+
+    # Crew sizes change with every crew rotation: drawn over the layer
+    layout.draw(count_ops, frame.imageblack, FONT)
+
+    # Dynamic layer (white background plus the number in RED)
+    frame.imagered.fill(0xff)
+    layout.draw(red_ops, frame.imagered)
+
+def display_space_info(web_server=None, display=None, space_data=None):
+    """Main function to display space information with RED number
+
+    space_data is queried from the API unless the caller already has it.
+    """
+
+    # Reuse the long-lived display if we have one; it refreshes in the
+    # background and the caller polls it. A one-off display is waited for.
+    background = display is not None
+    if display is None:
+        display = SpaceDisplay()
+    # Free slot: rendering does not wait for a refresh still running
+    frame = display.frame()
 
     # Get space data
-    space_data = query_api()
+    if space_data is None:
+        space_data, _ = query_api()
     timestamp = format_timestamp()
 
     # Update web server data if provided
@@ -237,79 +622,31 @@ def display_space_info(web_server=None):
         num_people = space_data.get('number', 0)
         people_list = space_data.get('people', [])
 
-        # Group by spacecraft
-        spacecraft_groups = group_by_spacecraft(people_list)
-
-        # Clear framebuffers (white background)
-        epd.imageblack.fill(0xff)
-        epd.imagered.fill(0xff)
-
-        # Center everything for cleaner look
-        center_x = epd.width // 2
-
-        # Spacecraft list at the top - centered horizontally, can wrap to multiple lines
-        spacecraft_items = list(spacecraft_groups.items())
-        spacecraft_text = "  ".join([f"{craft} ({len(names)})" for craft, names in spacecraft_items])
-
-        # Simple word wrapping for spacecraft list
-        spacecraft_start_y = 5
-        y_pos = spacecraft_start_y
-        line_height = 10
-        max_width = 35  # characters per line
-        words = spacecraft_text.split()
-        current_line = ""
-
-        for word in words:
-            test_line = current_line + " " + word if current_line else word
-            if len(test_line) <= max_width:
-                current_line = test_line
-            else:
-                # Draw current line centered
-                text_width = len(current_line) * 8
-                x_pos = center_x - text_width // 2
-                epd.imageblack.text(current_line, x_pos, y_pos, 0x00)
-                y_pos += line_height
-                current_line = word
-
-        # Draw last line
-        if current_line:
-            text_width = len(current_line) * 8
-            x_pos = center_x - text_width // 2
-            epd.imageblack.text(current_line, x_pos, y_pos, 0x00)
-            y_pos += line_height
-
-        spacecraft_end_y = y_pos
-
-        # Multilingual text at the bottom (fixed position)
-        text_block_height = 30  # 3 lines * 10px
-        bottom_text_y = epd.height - text_block_height - 3
-
-        epd.imageblack.text("Mensen in de ruimte", center_x - 76, bottom_text_y, 0x00)
-        epd.imageblack.text("Humans in Space", center_x - 60, bottom_text_y + 10, 0x00)
-        epd.imageblack.text("Gens dans l'espace", center_x - 72, bottom_text_y + 20, 0x00)
-
-        # Calculate vertical center between spacecraft and bottom text
-        number_height = 50  # approximate height of the big number
-        available_space = bottom_text_y - spacecraft_end_y
-        number_y = spacecraft_end_y + (available_space - number_height) // 2
-
-        # Draw huge RED number in vertical center
-        epd.draw_huge_number(epd.imagered, num_people, center_x, number_y)
-
-        # Update display
-        epd.display()
+        model = layout.view_model(num_people, people_list)
+
+        # A manifest rendered before (even before a reboot) is read back
+        # from flash instead of being drawn again
+        key = frame_key(model)
+        if FRAME_CACHE.load(key, (frame.buffer_black, frame.buffer_red)):
+            print('Frame loaded from cache')
+        else:
+            render_frame(frame, model)
+            FRAME_CACHE.store(key, (frame.buffer_black, frame.buffer_red))
 
     else:
         # Error display
-        epd.imageblack.fill(0xff)
-        epd.imagered.fill(0xff)
-        epd.imagered.text("Connection Error", 80, 50, 0x00)
-        epd.imageblack.text("Check WiFi", 95, 70, 0x00)
-        epd.display()
-
-    # Sleep to save power
-    epd.delay_ms(2000)
-    epd.sleep()
+        frame.imageblack.fill(0xff)
+        frame.imagered.fill(0xff)
+        frame.imagered.text("Connection Error", 80, 50, 0x00)
+        frame.imageblack.text("Check WiFi", 95, 70, 0x00)
+
+    # Refresh only if the panel does not already show this frame; during a
+    # refresh the frame waits and replaces any older one still waiting
+    if display.submit():
+        if not background:
+            display.wait()
+    else:
+        print('Frame unchanged, skipping refresh')
 
 if __name__ == "__main__":
     display_space_info()
@@ -1,11 +1,16 @@
-import urequests
-import ujson
+import astros_json
+import api_cache
 from machine import Pin, SPI
 import framebuf
 import utime
+import epd_rotate
+import huge_digits
+import layout
+import bitmap_font
+import epd_seq
 
 # LUT tables for e-paper display
-EPD_2IN9D_lut_vcomDC =[
+EPD_2IN9D_lut_vcomDC = bytes([
     0x00, 0x08, 0x00, 0x00, 0x00, 0x02,
     0x60, 0x28, 0x28, 0x00, 0x00, 0x01,
     0x00, 0x14, 0x00, 0x00, 0x00, 0x01,
@@ -14,8 +19,8 @@ EPD_2IN9D_lut_vcomDC =[
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00,
-]
-EPD_2IN9D_lut_ww =[
+])
+EPD_2IN9D_lut_ww = bytes([
     0x40, 0x08, 0x00, 0x00, 0x00, 0x02,
     0x90, 0x28, 0x28, 0x00, 0x00, 0x01,
     0x40, 0x14, 0x00, 0x00, 0x00, 0x01,
@@ -23,8 +28,8 @@ EPD_2IN9D_lut_ww =[
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
-]
-EPD_2IN9D_lut_bw =[
+])
+EPD_2IN9D_lut_bw = bytes([
     0x40, 0x17, 0x00, 0x00, 0x00, 0x02,
     0x90, 0x0F, 0x0F, 0x00, 0x00, 0x03,
     0x40, 0x0A, 0x01, 0x00, 0x00, 0x01,
@@ -32,8 +37,8 @@ EPD_2IN9D_lut_bw =[
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
-]
-EPD_2IN9D_lut_wb =[
+])
+EPD_2IN9D_lut_wb = bytes([
      0x80, 0x08, 0x00, 0x00, 0x00, 0x02,
     0x90, 0x28, 0x28, 0x00, 0x00, 0x01,
     0x80, 0x14, 0x00, 0x00, 0x00, 0x01,
@@ -41,8 +46,8 @@ EPD_2IN9D_lut_wb =[
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
-]
-EPD_2IN9D_lut_bb =[
+])
+EPD_2IN9D_lut_bb = bytes([
     0x80, 0x08, 0x00, 0x00, 0x00, 0x02,
     0x90, 0x28, 0x28, 0x00, 0x00, 0x01,
     0x80, 0x14, 0x00, 0x00, 0x00, 0x01,
@@ -50,10 +55,10 @@ EPD_2IN9D_lut_bb =[
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
-]
+])
 
 # Partial update LUT tables
-EPD_2IN9D_lut_vcom1 =[
+EPD_2IN9D_lut_vcom1 = bytes([
     0x00, 0x19, 0x01, 0x00, 0x00, 0x01,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
@@ -62,8 +67,8 @@ EPD_2IN9D_lut_vcom1 =[
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00
     ,0x00, 0x00,
-]
-EPD_2IN9D_lut_ww1 =[
+])
+EPD_2IN9D_lut_ww1 = bytes([
     0x00, 0x19, 0x01, 0x00, 0x00, 0x01,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
@@ -71,8 +76,8 @@ EPD_2IN9D_lut_ww1 =[
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
-]
-EPD_2IN9D_lut_bw1 =[
+])
+EPD_2IN9D_lut_bw1 = bytes([
     0x80, 0x19, 0x01, 0x00, 0x00, 0x01,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
@@ -80,8 +85,8 @@ EPD_2IN9D_lut_bw1 =[
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
-]
-EPD_2IN9D_lut_wb1 =[
+])
+EPD_2IN9D_lut_wb1 = bytes([
     0x40, 0x19, 0x01, 0x00, 0x00, 0x01,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
@@ -89,8 +94,8 @@ EPD_2IN9D_lut_wb1 =[
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
-]
-EPD_2IN9D_lut_bb1 =[
+])
+EPD_2IN9D_lut_bb1 = bytes([
     0x00, 0x19, 0x01, 0x00, 0x00, 0x01,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
@@ -98,7 +103,7 @@ EPD_2IN9D_lut_bb1 =[
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
-]
+])
 
 # Hardware is 128x296 (portrait), but we'll draw landscape and rotate
 EPD_WIDTH       = 128
@@ -109,8 +114,51 @@ DC_PIN          = 8
 CS_PIN          = 9
 BUSY_PIN        = 13
 
+# Controller sequences, compiled once (see epd_seq)
+SEQ_INIT = epd_seq.compile((
+    (0x01, b'\x03\x00\x2b\x2b\x03'),        # power setting
+    (0x06, b'\x17\x17\x17'),                # booster soft start
+    (0x04, b'', epd_seq.BUSY),              # power on
+    (0x00, b'\xbf\x0e'),                    # panel setting
+    (0x30, b'\x3a'),                        # PLL
+    (0x61, bytes((EPD_WIDTH, EPD_HEIGHT >> 8, EPD_HEIGHT & 0xff))),    # resolution
+    (0x82, b'\x28'),                        # VCOM DC
+))
+SEQ_FULL_REG = epd_seq.compile((
+    (0x50, b'\xb7'),
+    (0x20, EPD_2IN9D_lut_vcomDC),
+    (0x21, EPD_2IN9D_lut_ww),
+    (0x22, EPD_2IN9D_lut_bw),
+    (0x23, EPD_2IN9D_lut_bb),
+    (0x24, EPD_2IN9D_lut_wb),
+))
+SEQ_PART_REG = epd_seq.compile((
+    (0x82, b'\x00'),
+    (0x50, b'\xb7'),
+    (0x20, EPD_2IN9D_lut_vcom1),
+    (0x21, EPD_2IN9D_lut_ww1),
+    (0x22, EPD_2IN9D_lut_bw1),
+    (0x23, EPD_2IN9D_lut_wb1),
+    (0x24, EPD_2IN9D_lut_bb1),
+))
+SEQ_SLEEP = epd_seq.compile((
+    (0x50, b'\xf7'),
+    (0x02, b''),                            # power off
+    (0x07, b'\xa5'),                        # deep sleep
+))
+
+# Bytes per SPI write when streaming a constant fill (divides 296 * 16)
+FILL_CHUNK      = 128
+
+# Partial refreshes allowed before a full refresh clears the ghosting
+FULL_REFRESH_EVERY = 10
+
+# Area inside the center border that holds the big number (landscape x, y, w, h)
+NUMBER_BOX = (66, 20, 164, 60)
+NUMBER_Y = 25
+
 class EPD_2IN9_D_Landscape(framebuf.FrameBuffer):
-    def __init__(self):
+    def __init__(self, full_refresh_every=FULL_REFRESH_EVERY):
         self.reset_pin = Pin(RST_PIN, Pin.OUT)
         self.busy_pin = Pin(BUSY_PIN, Pin.IN, Pin.PULL_UP)
         self.cs_pin = Pin(CS_PIN, Pin.OUT)
@@ -121,24 +169,24 @@ class EPD_2IN9_D_Landscape(framebuf.FrameBuffer):
         self.width = EPD_HEIGHT  # 296
         self.height = EPD_WIDTH  # 128
 
-        self.lut_vcomDC = EPD_2IN9D_lut_vcomDC
-        self.lut_ww = EPD_2IN9D_lut_ww
-        self.lut_bw = EPD_2IN9D_lut_bw
-        self.lut_wb = EPD_2IN9D_lut_wb
-        self.lut_bb = EPD_2IN9D_lut_bb
-
-        self.lut_vcom1 = EPD_2IN9D_lut_vcom1
-        self.lut_ww1 = EPD_2IN9D_lut_ww1
-        self.lut_bw1 = EPD_2IN9D_lut_bw1
-        self.lut_wb1 = EPD_2IN9D_lut_wb1
-        self.lut_bb1 = EPD_2IN9D_lut_bb1
-
         self.spi = SPI(1)
         self.spi.init(baudrate=4000_000)
         self.dc_pin = Pin(DC_PIN, Pin.OUT)
 
+        # Preallocated transfer buffers so a refresh does not touch the heap
+        self.byte_buffer = bytearray(1)
+        self.fill_chunk = bytearray(FILL_CHUNK)
+
         # Create buffer for physical display (portrait)
         self.hw_buffer = bytearray(self.hw_height * self.hw_width // 8)
+        # One portrait row of a partial window, inverted for the old-data plane
+        self.window_row = bytearray(self.hw_width // 8)
+        self.full_refresh_every = full_refresh_every
+        self.partial_count = 0
+        # True after sleep(): the controller needs a reset and init first
+        self.asleep = False
+        # View model on the glass, as from layout.view_model()
+        self.shown = None
         # Create landscape framebuffer
         self.buffer = bytearray(self.height * self.width // 8)
         super().__init__(self.buffer, self.width, self.height, framebuf.MONO_HLSB)
@@ -154,7 +202,8 @@ class EPD_2IN9_D_Landscape(framebuf.FrameBuffer):
         utime.sleep_ms(delaytime)
 
     def spi_writebyte(self, data):
-        self.spi.write(bytearray(data))
+        self.byte_buffer[0] = data
+        self.spi.write(self.byte_buffer)
 
     def module_exit(self):
         self.digital_write(self.reset_pin, 0)
@@ -170,19 +219,34 @@ class EPD_2IN9_D_Landscape(framebuf.FrameBuffer):
     def send_command(self, command):
         self.digital_write(self.dc_pin, 0)
         self.digital_write(self.cs_pin, 0)
-        self.spi_writebyte([command])
+        self.spi_writebyte(command)
         self.digital_write(self.cs_pin, 1)
 
     def send_data(self, data):
         self.digital_write(self.dc_pin, 1)
         self.digital_write(self.cs_pin, 0)
-        self.spi_writebyte([data])
+        self.spi_writebyte(data)
         self.digital_write(self.cs_pin, 1)
 
     def send_data1(self, buf):
+        # buf goes out as-is: bytes, bytearray or memoryview, no copy
         self.digital_write(self.dc_pin, 1)
         self.digital_write(self.cs_pin, 0)
-        self.spi.write(bytearray(buf))
+        self.spi.write(buf)
+        self.digital_write(self.cs_pin, 1)
+
+    def send_fill(self, value, count):
+        """Send count copies of value, reusing the preallocated fill chunk"""
+        chunk = self.fill_chunk
+        for i in range(len(chunk)):
+            chunk[i] = value
+        self.digital_write(self.dc_pin, 1)
+        self.digital_write(self.cs_pin, 0)
+        while count >= len(chunk):
+            self.spi.write(chunk)
+            count -= len(chunk)
+        if count:
+            self.spi.write(memoryview(chunk)[:count])
         self.digital_write(self.cs_pin, 1)
 
     def ReadBusy(self):
@@ -194,44 +258,10 @@ class EPD_2IN9_D_Landscape(framebuf.FrameBuffer):
         print('e-Paper busy release')
 
     def SetFullReg(self):
-        self.send_command(0x50)
-        self.send_data(0xB7)
-
-        self.send_command(0x20)
-        self.send_data1(self.lut_vcomDC[0:44])
-
-        self.send_command(0x21)
-        self.send_data1(self.lut_ww[0:42])
-
-        self.send_command(0x22)
-        self.send_data1(self.lut_bw[0:42])
-
-        self.send_command(0x23)
-        self.send_data1(self.lut_bb[0:42])
-
-        self.send_command(0x24)
-        self.send_data1(self.lut_wb[0:42])
+        epd_seq.run(self, SEQ_FULL_REG)
 
     def SetPartReg(self):
-        self.send_command(0x82)
-        self.send_data(0x00)
-        self.send_command(0x50)
-        self.send_data(0xB7)
-
-        self.send_command(0x20)
-        self.send_data1(self.lut_vcom1[0:44])
-
-        self.send_command(0x21)
-        self.send_data1(self.lut_ww1[0:42])
-
-        self.send_command(0x22)
-        self.send_data1(self.lut_bw1[0:42])
-
-        self.send_command(0x23)
-        self.send_data1(self.lut_wb1[0:42])
-
-        self.send_command(0x24)
-        self.send_data1(self.lut_bb1[0:42])
+        epd_seq.run(self, SEQ_PART_REG)
 
     def TurnOnDisplay(self):
         self.send_command(0x12)
@@ -241,224 +271,259 @@ class EPD_2IN9_D_Landscape(framebuf.FrameBuffer):
     def init(self):
         print('init')
         self.reset()
+        epd_seq.run(self, SEQ_INIT)
+        self.asleep = False
 
-        self.send_command(0x01)
-        self.send_data(0x03)
-        self.send_data(0x00)
-        self.send_data(0x2B)
-        self.send_data(0x2B)
-        self.send_data(0x03)
-
-        self.send_command(0x06)
-        self.send_data(0x17)
-        self.send_data(0x17)
-        self.send_data(0x17)
-
-        self.send_command(0x04)
-        self.ReadBusy()
-
-        self.send_command(0x00)
-        self.send_data(0xBF)
-        self.send_data(0x0E)
-
-        self.send_command(0x30)
-        self.send_data(0x3A)
-
-        # Send physical dimensions to hardware
-        self.send_command(0x61)
-        self.send_data(self.hw_width)
-        self.send_data((self.hw_height&0x100)>>8)
-        self.send_data(self.hw_height&0xff)
-
-        self.send_command(0x82)
-        self.send_data(0x28)
+    def wake(self):
+        """Bring the controller back out of deep sleep; only a reset does"""
+        if self.asleep:
+            self.init()
 
     def rotate_buffer_90(self):
         """Rotate landscape buffer 90 degrees clockwise to portrait for display"""
-        # Landscape: 296x128, Portrait: 128x296
-        # Create a portrait framebuffer
-        portrait_fb = framebuf.FrameBuffer(self.hw_buffer, self.hw_width, self.hw_height, framebuf.MONO_HLSB)
-        portrait_fb.fill(0xff)
-
-        # Rotate each pixel from landscape to portrait
-        # Landscape (x, y) -> Portrait (y, 127-x)
-        for y in range(self.height):  # 0-127
-            for x in range(self.width):  # 0-295
-                # Get pixel from landscape buffer
-                pixel = self.pixel(x, y)
-                # Set in portrait buffer with 90-degree rotation
-                portrait_fb.pixel(y, self.hw_height - 1 - x, pixel)
+        # Landscape (x, y) -> Portrait (y, 295-x), done in 8x8 bit blocks
+        epd_rotate.rotate_plane(self.buffer, self.hw_buffer, self.width, self.height)
 
     def display(self, image):
+        self.wake()
         # Rotate landscape buffer to portrait for hardware
         self.rotate_buffer_90()
 
         high = self.hw_height
         wide = self.hw_width // 8
         self.send_command(0x10)
-        self.send_data1([0x00] * high * wide)
+        self.send_fill(0x00, high * wide)
 
         self.send_command(0x13)
         self.send_data1(self.hw_buffer)
 
         self.SetFullReg()
         self.TurnOnDisplay()
+        self.partial_count = 0
+
+    def send_window(self, py0, py1, bx0, bx1, invert):
+        """Send the bytes bx0..bx1 of portrait rows py0..py1 as one data burst"""
+        stride = self.hw_width // 8
+        n = bx1 - bx0
+        row = memoryview(self.window_row)[:n]
+        buf = self.hw_buffer
+        mask = 0xff if invert else 0x00
+        self.digital_write(self.dc_pin, 1)
+        self.digital_write(self.cs_pin, 0)
+        for py in range(py0, py1):
+            i = py * stride + bx0
+            for j in range(n):
+                row[j] = buf[i + j] ^ mask
+            self.spi.write(row)
+        self.digital_write(self.cs_pin, 1)
+
+    def display_partial(self, x, y, w, h):
+        """Refresh only the landscape rectangle (x, y, w, h) with the partial LUTs
+
+        Every full_refresh_every partial updates a full refresh is done
+        instead, to clear the ghosting partial updates leave behind.
+        """
+        if self.partial_count >= self.full_refresh_every:
+            print('Partial limit reached, doing a full refresh')
+            self.display(self.buffer)
+            return
+
+        self.wake()
+        self.rotate_buffer_90()
+
+        # Landscape y is portrait x, which the controller needs byte aligned
+        px0 = max(y, 0) & ~7
+        px1 = min((y + h + 7) & ~7, self.hw_width)
+        # Landscape x runs bottom to top in portrait
+        py0 = max(self.hw_height - x - w, 0)
+        py1 = min(self.hw_height - x, self.hw_height)
+        if px0 >= px1 or py0 >= py1:
+            return
+
+        self.SetPartReg()
+        self.send_command(0x91)  # PARTIAL_IN
+        self.send_command(0x90)  # PARTIAL_WINDOW
+        self.send_data(px0)
+        self.send_data(px1 - 1)
+        self.send_data(py0 >> 8)
+        self.send_data(py0 & 0xff)
+        self.send_data((py1 - 1) >> 8)
+        self.send_data((py1 - 1) & 0xff)
+        self.send_data(0x28)
+
+        self.send_command(0x10)
+        self.send_window(py0, py1, px0 // 8, px1 // 8, True)
+
+        self.send_command(0x13)
+        self.send_window(py0, py1, px0 // 8, px1 // 8, False)
+
+        self.TurnOnDisplay()
+        self.send_command(0x92)  # PARTIAL_OUT
+        self.partial_count += 1
 
     def Clear(self, color):
         high = self.hw_height
         wide = self.hw_width // 8
         self.send_command(0x10)
-        self.send_data1([color] * high * wide)
+        self.send_fill(color, high * wide)
 
         self.send_command(0x13)
-        self.send_data1([~color] * high * wide)
+        self.send_fill(~color & 0xff, high * wide)
 
         self.SetFullReg()
         self.TurnOnDisplay()
 
     def sleep(self):
-        self.send_command(0x50)
-        self.send_data(0xF7)
-        self.send_command(0x02)
-        self.send_command(0x07)
-        self.send_data(0xA5)
-
-    def draw_huge_digit(self, digit, x, y):
-        """Draw a single large digit (roughly 40x60 pixels)"""
-        # Simple 7-segment-style digits using rectangles
-        digits = {
-            '0': [(0,0,30,8), (0,0,8,50), (22,0,8,50), (0,42,30,8)],
-            '1': [(22,0,8,50)],
-            '2': [(0,0,30,8), (22,0,8,25), (0,21,30,8), (0,25,8,25), (0,42,30,8)],
-            '3': [(0,0,30,8), (22,0,8,25), (0,21,30,8), (22,25,8,25), (0,42,30,8)],
-            '4': [(0,0,8,25), (22,0,8,50), (0,21,30,8)],
-            '5': [(0,0,30,8), (0,0,8,25), (0,21,30,8), (22,25,8,25), (0,42,30,8)],
-            '6': [(0,0,30,8), (0,0,8,50), (0,21,30,8), (22,25,8,25), (0,42,30,8)],
-            '7': [(0,0,30,8), (22,0,8,50)],
-            '8': [(0,0,30,8), (0,0,8,50), (22,0,8,50), (0,21,30,8), (0,42,30,8)],
-            '9': [(0,0,30,8), (0,0,8,25), (22,0,8,50), (0,21,30,8), (0,42,30,8)],
-        }
-
-        if digit in digits:
-            for rect in digits[digit]:
-                self.fill_rect(x + rect[0], y + rect[1], rect[2], rect[3], 0x00)
-
-    def draw_huge_number(self, number, center_x, y):
+        if self.asleep:
+            return
+        epd_seq.run(self, SEQ_SLEEP)
+        self.asleep = True
+
+    def draw_huge_number(self, number, center_x, y, max_width=None):
         """Draw a large number centered at center_x"""
-        num_str = str(number)
-        digit_width = 35
-        total_width = len(num_str) * digit_width
-        start_x = center_x - (total_width // 2)
+        return huge_digits.draw_huge_number(self, number, center_x, y, max_width=max_width)
 
-        for i, digit in enumerate(num_str):
-            self.draw_huge_digit(digit, start_x + (i * digit_width), y)
+# Validators and data of the last good API response, for conditional GETs
+API_URL = 'http://api.open-notify.org/astros.json'
+API_CACHE = api_cache.ApiCache('api_cache.json')
 
-# API query function
+# API query function: (data, unchanged), data None on failure
 def query_api():
     try:
-        url = 'http://api.open-notify.org/astros.json'
-        response = urequests.get(url)
-        if response.status_code == 200:
-            json_data = ujson.loads(response.text)
-            print("API Response:", json_data)
-            return json_data
-        else:
-            print("Failed to get data, status code:", response.status_code)
-            return None
+        return API_CACHE.fetch(API_URL, astros_json.load) or (None, False)
     except Exception as e:
         print("Error querying API:", e)
+        return None, False
+
+# Proportional font for all text but the number (None: built-in 8x8 font)
+FONT = bitmap_font.load('font.pf')
+
+# Side columns (60px) | Center (176px) | Side columns; total width 296px
+COLUMN_WIDTH    = 60
+COLUMN_TEXT_WIDTH = COLUMN_WIDTH - 4
+COLUMN_LINE     = 9     # craft name to crew size
+COLUMN_PITCH    = 22    # craft name, crew size, gap
+COLUMN_BOTTOM   = 115
+
+def column_slots(count):
+    """Landscape (x, y) of each craft's name, split between the left and
+    right column; None for crafts that do not fit above COLUMN_BOTTOM
+    """
+    mid_point = (count + 1) // 2
+    slots = []
+    for i in range(count):
+        if i < mid_point:
+            x, row = 2, i
+        else:
+            x, row = EPD_HEIGHT - COLUMN_WIDTH + 2, i - mid_point
+        y = 5 + row * COLUMN_PITCH
+        slots.append((x, y) if y <= COLUMN_BOTTOM else None)
+    return slots
+
+@layout.memoise
+def landscape_layout(number, crafts):
+    """Draw operations for a view model"""
+    width = EPD_HEIGHT
+    center_x = width // 2
+    right_col_start = width - COLUMN_WIDTH
+
+    # Huge number in the centre, "HUMANS IN SPACE" below it, boxed
+    ops = [
+        (layout.NUMBER, number, center_x, NUMBER_Y, NUMBER_BOX[2]),
+        (layout.TEXT, "HUMANS IN SPACE", layout.centered_x("HUMANS IN SPACE", center_x, FONT), 95, 0x00),
+    ]
+    center_left = COLUMN_WIDTH + 5
+    center_right = right_col_start - 5
+    ops.append((layout.RECT, center_left, 15, center_right - center_left, 95, 0x00))
+
+    # Spacecraft split between the left and right column
+    for slot, (craft, count) in zip(column_slots(len(crafts)), crafts):
+        if slot is None:
+            continue
+        x, y_pos = slot
+        # Truncate to the pixel width of the narrow column
+        ops.append((layout.TEXT, layout.truncate(craft, COLUMN_TEXT_WIDTH, FONT), x, y_pos, 0x00))
+        ops.append((layout.TEXT, "({})".format(count), x, y_pos + COLUMN_LINE, 0x00))
+    return tuple(ops)
+
+def craft_names(model):
+    return tuple(craft for craft, count in model[1])
+
+def changed_area(model, shown):
+    """Landscape (x, y, w, h) around the number and the crew sizes that
+    differ between two view models with the same crafts, or None
+    """
+    rects = []
+    if model[0] != shown[0]:
+        rects.append(NUMBER_BOX)
+    for slot, (craft, count), (_, old) in zip(column_slots(len(model[1])), model[1], shown[1]):
+        if slot is not None and count != old:
+            rects.append((slot[0], slot[1] + COLUMN_LINE, COLUMN_TEXT_WIDTH, COLUMN_PITCH - COLUMN_LINE))
+    if not rects:
         return None
-
-def group_by_spacecraft(people_list):
-    """Group people by their spacecraft"""
-    spacecraft_dict = {}
-    for person in people_list:
-        craft = person.get('craft', 'Unknown')
-        if craft not in spacecraft_dict:
-            spacecraft_dict[craft] = []
-        spacecraft_dict[craft].append(person.get('name', 'Unknown'))
-    return spacecraft_dict
+    x0 = min(r[0] for r in rects)
+    y0 = min(r[1] for r in rects)
+    x1 = max(r[0] + r[2] for r in rects)
+    y1 = max(r[1] + r[3] for r in rects)
+    return x0, y0, x1 - x0, y1 - y0
+
+def update_counts(epd, model, shown):
+    """Redraw model and push only the changed number and crew sizes with a
+    partial refresh; shown is the view model on the panel, with the same
+    crafts. Returns False if nothing on the panel changes.
+    """
+    area = changed_area(model, shown)
+    if area is None:
+        return False
+    # Only the changed numbers differ from the buffer's current contents
+    epd.fill(0xff)
+    layout.draw(landscape_layout(*model), epd, FONT)
+    epd.display_partial(*area)
+    return True
+
+# Driver kept across display_space_info() calls, so its buffer still holds
+# the shown layout for update_counts()
+DISPLAY = None
+
+def get_display():
+    global DISPLAY
+    if DISPLAY is None:
+        DISPLAY = EPD_2IN9_D_Landscape()
+    return DISPLAY
 
 def display_space_info():
     """Main function to display space information on e-paper in landscape"""
 
-    # Initialize display
-    epd = EPD_2IN9_D_Landscape()
-    epd.Clear(0x00)
+    # The frame is drawn off-screen and shown with one refresh
+    epd = get_display()
 
     # Get space data
-    space_data = query_api()
+    space_data, _ = query_api()
 
     if space_data:
         num_people = space_data.get('number', 0)
         people_list = space_data.get('people', [])
+        model = layout.view_model(num_people, people_list)
+        shown = epd.shown
+
+        if model == shown:
+            print('Display already up to date')
+            sent = False
+        elif shown is not None and craft_names(model) == craft_names(shown):
+            # Same crafts in the same places: only numbers change
+            sent = update_counts(epd, model, shown)
+        else:
+            # Layout is memoised, so a known crew manifest skips it
+            ops = landscape_layout(*model)
 
-        # Group by spacecraft
-        spacecraft_groups = group_by_spacecraft(people_list)
-
-        # Clear framebuffer (white background)
-        epd.fill(0xff)
+            # Clear framebuffer (white background)
+            epd.fill(0xff)
+            layout.draw(ops, epd, FONT)
 
-        # Layout: Left column (60px) | Center (176px) | Right column (60px)
-        # Total width: 296px
-        left_col_width = 60
-        right_col_start = epd.width - 60
-
-        # Draw huge number in center (centered in middle section)
-        center_x = epd.width // 2
-        epd.draw_huge_number(num_people, center_x, 25)
-
-        # Draw "HUMANS IN SPACE" text below number
-        epd.text("HUMANS IN SPACE", center_x - 56, 95, 0x00)
-
-        # Draw border box around center
-        center_left = left_col_width + 5
-        center_right = right_col_start - 5
-        epd.rect(center_left, 15, center_right - center_left, 95, 0x00)
-
-        # Left column - spacecraft list
-        left_x = 2
-        y_pos = 5
-        line_height = 14
-
-        spacecraft_items = list(spacecraft_groups.items())
-
-        # Split items between left and right
-        mid_point = (len(spacecraft_items) + 1) // 2
-        left_items = spacecraft_items[:mid_point]
-        right_items = spacecraft_items[mid_point:]
-
-        # Draw left column
-        for craft, names in left_items:
-            if y_pos > 115:
-                break
-            count = len(names)
-            # Aggressive truncation for narrow column
-            if len(craft) > 6:
-                craft = craft[:5] + "."
-            text = f"{craft}"
-            epd.text(text, left_x, y_pos, 0x00)
-            epd.text(f"({count})", left_x, y_pos + 8, 0x00)
-            y_pos += line_height + 8
-
-        # Right column - spacecraft list
-        right_x = right_col_start + 2
-        y_pos = 5
-
-        for craft, names in right_items:
-            if y_pos > 115:
-                break
-            count = len(names)
-            # Aggressive truncation for narrow column
-            if len(craft) > 6:
-                craft = craft[:5] + "."
-            text = f"{craft}"
-            epd.text(text, right_x, y_pos, 0x00)
-            epd.text(f"({count})", right_x, y_pos + 8, 0x00)
-            y_pos += line_height + 8
-
-        # Update display
-        epd.display(epd.buffer)
+            # Update display
+            epd.display(epd.buffer)
+            sent = True
+        epd.shown = model
 
     else:
         # Error display
@@ -466,10 +531,13 @@ def display_space_info():
         epd.text("Connection Error", 80, 50, 0x00)
         epd.text("Check WiFi", 95, 70, 0x00)
         epd.display(epd.buffer)
+        epd.shown = None
+        sent = True
 
-    # Sleep to save power
-    epd.delay_ms(2000)
-    epd.sleep()
+    # Sleep to save power, once the panel has settled after a refresh
+    if sent:
+        epd.delay_ms(2000)
+        epd.sleep()
 
 if __name__ == "__main__":
     display_space_info()
@@ -0,0 +1,59 @@
+"""Cached static layers for the display layouts
+
+A static layer is the part of a frame that rarely changes: the captions,
+the background and the spacecraft names. It is rasterised into a plane
+once and kept in flash as a raw plane file. Later frames with the same key
+read the plane straight into the frame buffer with readinto() instead of
+drawing it again, so only the dynamic parts (crew sizes and the number)
+are rendered per update. No RAM is held beyond the key.
+"""
+import os
+
+class StaticLayer:
+    def __init__(self, name):
+        self.plane_file = name + '.bin'
+        self.key_file = name + '.key'
+        # Key of the plane on flash; None until read
+        self.key = None
+
+    def _read_key(self):
+        try:
+            with open(self.key_file, 'r') as f:
+                self.key = f.read()
+        except:
+            self.key = ''
+
+    def load(self, key, buffer):
+        """Fill buffer with the cached plane if it was stored under key
+
+        Returns True on a hit, False on a miss.
+        """
+        if self.key is None:
+            self._read_key()
+        if self.key != key:
+            return False
+        try:
+            with open(self.plane_file, 'rb') as f:
+                return f.readinto(buffer) == len(buffer)
+        except OSError:
+            return False
+
+    def store(self, key, buffer):
+        """Save buffer as the layer for key"""
+        try:
+            # Drop the old key first so a half-written plane never matches
+            self.invalidate()
+            with open(self.plane_file, 'wb') as f:
+                f.write(buffer)
+            with open(self.key_file, 'w') as f:
+                f.write(key)
+            self.key = key
+        except OSError as e:
+            print('Could not store layer:', e)
+
+    def invalidate(self):
+        self.key = ''
+        try:
+            os.remove(self.key_file)
+        except OSError:
+            pass
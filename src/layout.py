@@ -0,0 +1,162 @@
+"""Layout engine for the display layouts
+
+A layout turns a view model (headcount plus (craft, crew size) pairs) into
+a list of draw operations. Layouts are memoised on the view model, so a
+render that repeats a known shape skips word wrapping, truncation and
+placement and only replays the operations.
+
+Text is measured and drawn with a proportional bitmap_font.Font when one
+is passed in. Without one the built-in 8x8 font is used, measured from its
+ink rather than as 8 px per character, so centring and column fitting are
+pixel accurate either way.
+"""
+import framebuf
+import huge_digits
+
+# Draw operations
+TEXT    = 0     # (TEXT, string, x, y, colour)
+RECT    = 1     # (RECT, x, y, w, h, colour)
+NUMBER  = 2     # (NUMBER, number, center_x, y, max_width)
+
+# Cell size of the built-in font
+FONT_SIZE = 8
+
+# Layouts remembered per layout function
+CACHE_SIZE = 4
+
+# Font byte -> (first, last) inked column of its cell, None when blank
+_ink = {}
+_cell = bytearray(FONT_SIZE)
+_cell_fb = framebuf.FrameBuffer(_cell, FONT_SIZE, FONT_SIZE, framebuf.MONO_HLSB)
+
+def _char_ink(code):
+    # framebuf.text() draws one cell per UTF-8 byte, outside ASCII as 127
+    if code < 32 or code > 127:
+        code = 127
+    if code in _ink:
+        return _ink[code]
+    _cell_fb.fill(0)
+    _cell_fb.text(chr(code), 0, 0, 1)
+    columns = 0
+    for row in _cell:
+        columns |= row
+    ink = None
+    if columns:
+        # MONO_HLSB: bit 7 is column 0
+        first = 0
+        while not columns & (0x80 >> first):
+            first += 1
+        last = FONT_SIZE - 1
+        while not columns & (0x80 >> last):
+            last -= 1
+        ink = (first, last)
+    _ink[code] = ink
+    return ink
+
+def text_extent(s, font=None):
+    """(left, width) of the ink of s when drawn at x = 0"""
+    if font is not None:
+        return font.text_extent(s)
+    left = -1
+    right = -1
+    x = 0
+    for code in s.encode():
+        ink = _char_ink(code)
+        if ink:
+            if left < 0:
+                left = x + ink[0]
+            right = x + ink[1]
+        x += FONT_SIZE
+    if left < 0:
+        return 0, 0
+    return left, right - left + 1
+
+def text_width(s, font=None):
+    """Width in pixels of the ink of s"""
+    return text_extent(s, font)[1]
+
+def centered_x(s, center_x, font=None):
+    """x at which to draw s so its ink is centred on center_x"""
+    left, width = text_extent(s, font)
+    return center_x - width // 2 - left
+
+def truncate(s, max_width, font=None, suffix='.'):
+    """s cut down (with suffix) until its ink fits in max_width"""
+    if text_width(s, font) <= max_width:
+        return s
+    while s and text_width(s + suffix, font) > max_width:
+        s = s[:-1]
+    return s + suffix
+
+def wrap(text, max_width, font=None):
+    """Split text on spaces into lines whose ink fits in max_width
+
+    Words wider than max_width get a line of their own.
+    """
+    lines = []
+    line = ''
+    for word in text.split():
+        candidate = line + ' ' + word if line else word
+        if not line or text_width(candidate, font) <= max_width:
+            line = candidate
+        else:
+            lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+def view_model(number, people_list):
+    """(number, ((craft, crew size), ...)) in order of first appearance"""
+    crafts = []
+    sizes = {}
+    for person in people_list:
+        craft = person.get('craft', 'Unknown')
+        if craft not in sizes:
+            crafts.append(craft)
+            sizes[craft] = 0
+        sizes[craft] += 1
+    return number, tuple((craft, sizes[craft]) for craft in crafts)
+
+class Memo:
+    """Remember the last few results of a layout function by its arguments"""
+    def __init__(self, build, size=CACHE_SIZE):
+        self.build = build
+        self.size = size
+        self.results = {}
+        self.order = []
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, *key):
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+            result = self.build(*key)
+            if len(self.order) >= self.size:
+                del self.results[self.order.pop(0)]
+            self.results[key] = result
+            self.order.append(key)
+        else:
+            self.hits += 1
+        return result
+
+def memoise(build):
+    """Decorator turning a layout function into a memoised one"""
+    return Memo(build)
+
+def draw(ops, surface, font=None):
+    """Replay draw operations on anything with text(), rect() and blit()"""
+    for op in ops:
+        kind = op[0]
+        if kind == TEXT:
+            if font is not None:
+                font.text(surface, op[1], op[2], op[3], op[4])
+            else:
+                surface.text(op[1], op[2], op[3], op[4])
+        elif kind == RECT:
+            surface.rect(op[1], op[2], op[3], op[4], op[5])
+        elif kind == NUMBER:
+            huge_digits.draw_huge_number(surface, op[1], op[2], op[3], max_width=op[4])
+    if font is not None:
+        font.close()
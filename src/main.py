@@ -2,6 +2,7 @@ import network
 import time
 import machine
 import config
+import humansinspace_color
 
 # Import secrets for WiFi credentials
 try:
@@ -58,18 +59,37 @@ if wlan.isconnected():
     # Wait a moment for network to fully stabilize
     time.sleep(2)
 
-    # Sync time with NTP server
+    # Look up the hosts used from now on while nothing is waiting on them;
+    # later polls reuse the cached addresses
+    import dns_cache
     import ntptime
+    import urequests
+    # Data sources: the API unless config.json lists others (mirrors, a cache
+    # host, a LAN stand-in), in order of preference
+    api_sources = cfg.get('api_sources') or [humansinspace_color.API_URL]
+    humansinspace_color.API_SOURCES.configure(api_sources, cfg.get('hedge_ms'))
+    hosts = [(ntptime.NTP_HOST, ntptime.NTP_PORT)]
+    for url in api_sources:
+        api_host, api_port = urequests.urlparse(url)[1:3]
+        hosts.append((api_host, int(api_port)))
+    dns_cache.CACHE.warm(hosts)
+    print(dns_cache.CACHE.summary())
+
+    # Sync time with NTP server
     ntptime.set_time()
 
     # Start web server
     import webserver
-    import humansinspace_color
 
     server = webserver.SimpleWebServer(port=80)
     server.start()
+
+    # One display for the lifetime of the program, keeps its buffers
+    display = humansinspace_color.SpaceDisplay()
+    server.set_screen(display)
     print(f'Web server started at http://{ip_address}/')
     print(f'API endpoint: http://{ip_address}/api/latest')
+    print(f'Screen image: http://{ip_address}/api/screen')
 
     # Check if we need to update the display
     # Track last update time in a file
@@ -91,9 +111,20 @@ if wlan.isconnected():
         remaining_hours = (update_interval_seconds - time_since_update) / 3600
         print(f'Display updated {time_since_update // 60} minutes ago. Next update in {remaining_hours:.1f} hours')
 
+    import poll_scheduler
+
+    def poll_outcome(space_data, unchanged):
+        if not space_data:
+            return poll_scheduler.FAILED
+        if unchanged:
+            return poll_scheduler.UNCHANGED
+        return poll_scheduler.CHANGED
+
     # Query API and update web server data on first run
-    import humansinspace_color
-    space_data = humansinspace_color.query_api()
+    space_data, unchanged = humansinspace_color.query_api()
+    # Later polls go through urequests_async and its own pool: close the
+    # connection this query left idle rather than hold its socket for good
+    urequests.POOL.close()
     if space_data:
         timestamp = humansinspace_color.format_timestamp()
         server.set_data(space_data, timestamp)
@@ -114,7 +145,8 @@ if wlan.isconnected():
                 print(f'Scheduled update after {time_since_update // 3600} hours. Updating display...')
 
             # Update the e-paper display
-            humansinspace_color.display_space_info(web_server=server)
+            humansinspace_color.display_space_info(web_server=server, display=display,
+                                                   space_data=space_data)
 
             # Save the count and update time
             with open('last_count.txt', 'w') as f:
@@ -129,20 +161,34 @@ if wlan.isconnected():
     print('Web server is running. Accessible at all times.')
     print(f'Display will update every {update_interval_hours} hours.')
 
-    last_check_time = time.time()
-    check_interval = 60  # Check every minute if we need to update
-
-    while True:
-        server.handle_request()
-        time.sleep(0.1)
-
-        # Check if it's time to update the display
-        current_time = time.time()
-        if current_time - last_check_time >= check_interval:
-            last_check_time = current_time
-
-            # Check for data changes
-            space_data = humansinspace_color.query_api()
+    # Poll often after a change, less while the data is stable, and back off
+    # (with a circuit breaker) while the API fails. Polls stay at least as
+    # frequent as the scheduled display updates.
+    scheduler = poll_scheduler.PollScheduler(
+        max_interval=min(poll_scheduler.MAX_INTERVAL, update_interval_hours * 3600))
+    scheduler.record(poll_outcome(space_data, unchanged))
+    server.set_poller(scheduler, humansinspace_color.API_SOURCES)
+
+    # Serving and polling run as two uasyncio tasks: while a poll waits on
+    # the network, the web server keeps answering
+    import uasyncio
+
+    async def serve_forever():
+        while True:
+            server.handle_request()
+            # Finish any e-paper refresh running in the background
+            display.poll()
+            await uasyncio.sleep(0.1)
+
+    async def poll_forever():
+        while True:
+            await uasyncio.sleep(scheduler.next_delay())
+            scheduler.begin()
+            current_time = time.time()
+
+            # Check for data changes; the scheduler does the retrying
+            space_data, unchanged = await humansinspace_color.query_api_async(retries=1)
+            scheduler.record(poll_outcome(space_data, unchanged))
             if space_data:
                 timestamp = humansinspace_color.format_timestamp()
                 server.set_data(space_data, timestamp)
@@ -173,7 +219,8 @@ if wlan.isconnected():
                     else:
                         print(f'Scheduled update after {time_since_update // 3600} hours. Updating display...')
 
-                    humansinspace_color.display_space_info(web_server=server)
+                    humansinspace_color.display_space_info(web_server=server, display=display,
+                                                           space_data=space_data)
 
                     # Save the count and update time
                     with open('last_count.txt', 'w') as f:
@@ -181,6 +228,12 @@ if wlan.isconnected():
                     with open('last_update.txt', 'w') as f:
                         f.write(str(int(current_time)))
 
+    async def run():
+        uasyncio.create_task(serve_forever())
+        await poll_forever()
+
+    uasyncio.run(run())
+
 else:
     print('Failed to connect to WiFi')
     print('Check your credentials in secrets.py')
@@ -1,6 +1,7 @@
 import socket
 import struct
 import utime
+import dns_cache
 
 # NTP server
 NTP_HOST = "pool.ntp.org"
@@ -19,7 +20,7 @@ def set_time():
         ntp_query[0] = 0x1B  # NTP version 3, mode 3 (client)
 
         # Send request
-        addr = socket.getaddrinfo(NTP_HOST, NTP_PORT)[0][-1]
+        addr = dns_cache.getaddr(NTP_HOST, NTP_PORT)
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.settimeout(3)
         s.sendto(ntp_query, addr)
@@ -0,0 +1,115 @@
+"""When to poll the API next
+
+The crew changes a few times a month, so a fixed one-minute poll is
+mostly wasted requests and radio time. PollScheduler picks the delay
+before each poll from what the previous polls found:
+
+- unchanged data widens the interval by GROWTH, up to max_interval;
+- changed data drops it back to min_interval;
+- failures back off exponentially from min_interval, up to max_interval;
+- after breaker_failures failures in a row the circuit opens: no polls
+  for the cooldown, then one trial poll (half open) closes it again on
+  success or reopens it for twice as long on failure.
+
+Every delay is spread by +-JITTER so displays started together (after a
+power cut, say) do not poll in lockstep. status() is served at
+/api/poller.
+"""
+import random
+import utime
+
+MIN_INTERVAL        = 60        # seconds
+MAX_INTERVAL        = 3600
+GROWTH              = 2
+JITTER              = 0.1       # fraction of the delay
+BREAKER_FAILURES    = 5
+BREAKER_COOLDOWN    = 1800
+MAX_COOLDOWN        = 6 * 3600
+
+# Poll outcomes
+CHANGED     = 'changed'
+UNCHANGED   = 'unchanged'
+FAILED      = 'failed'
+
+# Circuit breaker states
+CLOSED      = 'closed'
+OPEN        = 'open'
+HALF_OPEN   = 'half-open'
+
+class PollScheduler:
+    def __init__(self, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 breaker_failures=BREAKER_FAILURES, breaker_cooldown=BREAKER_COOLDOWN):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        # Interval while polls succeed
+        self.interval = min_interval
+        # Consecutive failures
+        self.failures = 0
+        self.state = CLOSED
+        self.cooldown = breaker_cooldown
+        self.delay = 0
+        self.next_poll = None
+        self.last_outcome = None
+        self.polls = 0
+        self.changes = 0
+        self.errors = 0
+
+    def next_delay(self):
+        """Seconds to wait before the next poll"""
+        if self.state == OPEN:
+            base = self.cooldown
+        elif self.failures:
+            base = min(self.min_interval << min(self.failures, 16), self.max_interval)
+        else:
+            base = self.interval
+        spread = 1 - JITTER + 2 * JITTER * random.getrandbits(16) / 65536
+        self.delay = int(base * spread)
+        self.next_poll = utime.time() + self.delay
+        return self.delay
+
+    def begin(self):
+        """Call when the poll starts: after its cooldown an open breaker lets one through"""
+        if self.state == OPEN:
+            self.state = HALF_OPEN
+            print('Poller: circuit half open, trying the API')
+
+    def record(self, outcome):
+        """Account for a poll that was CHANGED, UNCHANGED or FAILED"""
+        self.polls += 1
+        self.last_outcome = outcome
+        if outcome == FAILED:
+            self.failures += 1
+            self.errors += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, MAX_COOLDOWN)
+                self.state = OPEN
+                print('Poller: trial failed, circuit open for', self.cooldown, 's')
+            elif self.failures >= self.breaker_failures:
+                self.state = OPEN
+                print('Poller:', self.failures, 'failures, circuit open for', self.cooldown, 's')
+            return
+        if self.state != CLOSED:
+            print('Poller: circuit closed')
+        self.state = CLOSED
+        self.cooldown = self.breaker_cooldown
+        self.failures = 0
+        if outcome == CHANGED:
+            self.changes += 1
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * GROWTH, self.max_interval)
+
+    def status(self):
+        return {
+            'state': self.state,
+            'interval': self.interval,
+            'delay': self.delay,
+            'next_poll': self.next_poll,
+            'failures': self.failures,
+            'last_outcome': self.last_outcome,
+            'polls': self.polls,
+            'changes': self.changes,
+            'errors': self.errors,
+        }
@@ -0,0 +1,183 @@
+"""Stream the frame buffers as a landscape PBM or indexed PNG
+
+The planes are the portrait hardware buffers (ink is 0). The image is
+produced in bands of 8 landscape rows: one byte column of the portrait
+plane is gathered and turned with epd_rotate, encoded into a fixed-size
+scratch buffer and handed to send(). Nothing close to a whole image is
+ever held in RAM.
+
+The PNG uses stored (uncompressed) deflate blocks, so it needs no zlib
+and both formats have a length known up front.
+"""
+import binascii
+import struct
+import epd_rotate
+
+FORMATS = {
+    'pbm': 'image/x-portable-bitmap',
+    'png': 'image/png',
+}
+
+# PNG palette: white, black, red
+PALETTE = b'\xff\xff\xff\x00\x00\x00\xff\x00\x00'
+
+# Byte of 8 pixels -> 16 bits of 2-bit pixels, ink bits become 01
+_spread = None
+
+def _spread_table():
+    global _spread
+    if _spread is None:
+        _spread = []
+        for v in range(256):
+            s = 0
+            for k in range(8):
+                if v & (1 << k):
+                    s |= 1 << (2 * k)
+            _spread.append(s)
+    return _spread
+
+def _chunk(kind, data):
+    """A complete PNG chunk"""
+    body = kind + data
+    return struct.pack('>I', len(data)) + body + struct.pack('>I', binascii.crc32(body))
+
+class Screenshot:
+    def __init__(self, hw_width, hw_height):
+        self.black = None
+        self.red = None
+        self.stride = hw_width // 8
+        # Landscape size
+        self.width = hw_height
+        self.height = hw_width
+        self.row_bytes = self.width // 8
+        self._column = bytearray(self.width)
+        self._bands = [bytearray(self.width), bytearray(self.width)]
+        # PNG rows: a filter byte plus 2 bits per pixel. Stored deflate
+        # blocks hold whole rows.
+        self.png_row = 1 + self.width // 4
+        self.block_rows = 0xFFFF // self.png_row
+        # Encoded band: 8 PNG rows, plus a block header that may start there
+        self._out = bytearray(8 * self.png_row + 5)
+
+    def _png_blocks(self):
+        return (self.height + self.block_rows - 1) // self.block_rows
+
+    def _idat_length(self):
+        # zlib header, stored block headers, rows, adler32
+        return 2 + 5 * self._png_blocks() + self.png_row * self.height + 4
+
+    def length(self, fmt):
+        """Size in bytes of the image in format fmt"""
+        if fmt == 'pbm':
+            return len(self._pbm_header()) + self.row_bytes * self.height
+        # Signature, IHDR, PLTE, IDAT, IEND
+        return 8 + (12 + 13) + (12 + len(PALETTE)) + (12 + self._idat_length()) + 12
+
+    def _pbm_header(self):
+        return 'P4\n{} {}\n'.format(self.width, self.height).encode()
+
+    def _band(self, plane, k, out):
+        """Landscape rows 8k..8k+7 of plane; row 8k+j is row 7-j of out"""
+        stride = self.stride
+        column = self._column
+        last = (self.width - 1) * stride + k
+        for i in range(self.width):
+            column[i] = plane[last - i * stride]
+        epd_rotate.rotate_plane(column, out, 8, self.width)
+
+    def _bands_of(self, k):
+        black = self._bands[0]
+        self._band(self.black, k, black)
+        red = None
+        if self.red is not None:
+            red = self._bands[1]
+            self._band(self.red, k, red)
+        return black, red
+
+    def stream(self, fmt, black, red, send):
+        """Encode the planes in format fmt, passing chunks to send()
+
+        red may be None for black and white panels.
+        """
+        self.black = black
+        self.red = red
+        try:
+            if fmt == 'pbm':
+                self._stream_pbm(send)
+            else:
+                self._stream_png(send)
+        finally:
+            self.black = self.red = None
+
+    def _stream_pbm(self, send):
+        send(self._pbm_header())
+        n = self.row_bytes
+        out = self._out
+        for k in range(self.height // 8):
+            black, red = self._bands_of(k)
+            o = 0
+            for j in range(8):
+                src = (7 - j) * n
+                for i in range(src, src + n):
+                    # PBM ink is 1; red shows as black
+                    v = black[i]
+                    if red is not None:
+                        v &= red[i]
+                    out[o] = v ^ 0xff
+                    o += 1
+            send(memoryview(out)[:o])
+
+    def _stream_png(self, send):
+        spread = _spread_table()
+        send(b'\x89PNG\r\n\x1a\n')
+        send(_chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height, 2, 3, 0, 0, 0)))
+        send(_chunk(b'PLTE', PALETTE))
+
+        # IDAT is streamed: its CRC is updated chunk by chunk
+        zlib_head = b'IDAT\x78\x01'
+        crc = binascii.crc32(zlib_head)
+        send(struct.pack('>I', self._idat_length()) + zlib_head)
+
+        a = 1
+        b = 0
+        block_left = 0
+        rows_left = self.height
+        n = self.row_bytes
+        out = self._out
+        for k in range(self.height // 8):
+            black, red = self._bands_of(k)
+            o = 0
+            for j in range(8):
+                if not block_left:
+                    block_left = min(self.block_rows, rows_left)
+                    rows_left -= block_left
+                    size = block_left * self.png_row
+                    # Stored block header (not part of the adler32)
+                    struct.pack_into('<BHH', out, o, 0 if rows_left else 1, size, size ^ 0xFFFF)
+                    o += 5
+                block_left -= 1
+                start = o
+                out[o] = 0      # filter: none
+                o += 1
+                src = (7 - j) * n
+                for i in range(src, src + n):
+                    bv = black[i]
+                    rv = red[i] if red is not None else 0xff
+                    # Index 1 where only black has ink, 2 where red has
+                    v = spread[~bv & rv & 0xff] | (spread[~rv & 0xff] << 1)
+                    out[o] = v >> 8
+                    out[o + 1] = v & 0xff
+                    o += 2
+                for i in range(start, o):
+                    a += out[i]
+                    b += a
+                a %= 65521
+                b %= 65521
+            chunk = memoryview(out)[:o]
+            crc = binascii.crc32(chunk, crc)
+            send(chunk)
+
+        adler = struct.pack('>I', (b << 16) | a)
+        crc = binascii.crc32(adler, crc)
+        send(adler + struct.pack('>I', crc))
+        send(_chunk(b'IEND', b''))
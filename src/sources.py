@@ -0,0 +1,205 @@
+"""Several places to get the API data from, ranked by health
+
+A Source is one URL serving astros.json: the upstream API, a mirror, our
+own cache host or a stand-in on the LAN. Each keeps a health record: a
+moving average of its response time, and its consecutive failures.
+Sources are ranked by score, the average response time multiplied by
+one plus the failures, and a source that failed MAX_FAILURES times in a
+row sits out for COOLDOWN seconds unless nothing else is left.
+
+fetch() asks the best source first. If it has not answered within the
+hedge delay, the next source is asked as well and whichever answers
+first wins; the other request is cancelled, and the time it had taken
+goes into its average, so a source that keeps losing drops in the
+ranking. A source that fails hands over to the next one at once. The
+time an update takes is then set by the best source that answers, not
+by the slowest one's timeout.
+"""
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+import utime
+
+# Response time assumed for a source not heard from yet, ms
+UNKNOWN_LATENCY = 2000
+# Weight of the newest response time in the moving average
+LATENCY_WEIGHT = 0.3
+MAX_FAILURES = 3
+COOLDOWN = 300
+# Hedge delay: twice the best source's average, within these bounds (ms)
+HEDGE_MIN = 300
+HEDGE_MAX = 3000
+
+class Source:
+    def __init__(self, url):
+        self.url = url
+        # Moving average of the response time in ms; None until one succeeds
+        self.latency = None
+        self.failures = 0
+        self.successes = 0
+        self.errors = 0
+        self.down_until = None
+
+    def score(self):
+        # At least 1 ms, so failures still count against a very fast source
+        latency = UNKNOWN_LATENCY if self.latency is None else max(self.latency, 1)
+        return latency * (1 + self.failures)
+
+    def available(self, now):
+        if self.down_until is None:
+            return True
+        return utime.ticks_diff(now, self.down_until) >= 0
+
+    def succeeded(self, ms):
+        self.successes += 1
+        self.failures = 0
+        self.down_until = None
+        if self.latency is None:
+            self.latency = ms
+        else:
+            self.latency += (ms - self.latency) * LATENCY_WEIGHT
+
+    def lost(self, ms):
+        """Cancelled after ms because another source answered first"""
+        # ms is only a lower bound on its response time: it can raise the
+        # average but never lower it, and it is not a failure
+        latency = UNKNOWN_LATENCY if self.latency is None else self.latency
+        if ms > latency:
+            self.latency = latency + (ms - latency) * LATENCY_WEIGHT
+
+    def failed(self):
+        self.errors += 1
+        self.failures += 1
+        if self.failures >= MAX_FAILURES:
+            self.down_until = utime.ticks_add(utime.ticks_ms(), COOLDOWN * 1000)
+
+    def status(self):
+        return {
+            'url': self.url,
+            'latency_ms': None if self.latency is None else int(self.latency),
+            'failures': self.failures,
+            'successes': self.successes,
+            'errors': self.errors,
+            'score': int(self.score()),
+        }
+
+class Sources:
+    def __init__(self, urls, hedge_ms=None):
+        self.sources = []
+        self.configure(urls, hedge_ms)
+
+    def configure(self, urls, hedge_ms=None):
+        """Use urls, in order of preference; keeps the records of known ones"""
+        known = {source.url: source for source in self.sources}
+        self.sources = [known.get(url) or Source(url) for url in urls]
+        # Fixed hedge delay in ms; None derives it from the best source
+        self.hedge_ms = hedge_ms
+
+    def ranked(self):
+        """Available sources by score (ties keep the configured order), then the rest"""
+        now = utime.ticks_ms()
+        up = [s for s in self.sources if s.available(now)]
+        down = [s for s in self.sources if not s.available(now)]
+        # MicroPython's sort is not stable: the index breaks ties
+        order = self.sources.index
+        up.sort(key=lambda s: (s.score(), order(s)))
+        down.sort(key=lambda s: (s.score(), order(s)))
+        return up + down
+
+    def hedge_delay(self, source):
+        """Seconds to wait for source before asking the next one too"""
+        if self.hedge_ms is not None:
+            ms = self.hedge_ms
+        elif source.latency is None:
+            ms = HEDGE_MAX
+        else:
+            ms = min(max(2 * source.latency, HEDGE_MIN), HEDGE_MAX)
+        return ms / 1000
+
+    async def fetch(self, fetch_one):
+        """Data from the first source that has it, or None
+
+        fetch_one(url) is awaited for each source asked and returns the
+        data or None; exceptions count as failures. At most two requests
+        are in flight at a time.
+        """
+        order = self.ranked()
+        if not order:
+            return None
+        done = asyncio.Event()
+        # (source, data) of finished requests, in the order they finished
+        finished = []
+        tasks = []
+
+        async def attempt(source):
+            start = utime.ticks_ms()
+            try:
+                data = await fetch_one(source.url)
+            except asyncio.CancelledError:
+                source.lost(utime.ticks_diff(utime.ticks_ms(), start))
+                raise
+            except Exception as e:
+                print('Source', source.url, 'failed:', repr(e))
+                data = None
+            if data is None:
+                source.failed()
+            else:
+                source.succeeded(utime.ticks_diff(utime.ticks_ms(), start))
+            finished.append((source, data))
+            done.set()
+
+        def ask(source):
+            tasks.append(asyncio.create_task(attempt(source)))
+
+        ask(order[0])
+        following = 1
+        in_flight = 1
+        try:
+            while in_flight:
+                if not finished:
+                    if in_flight == 1 and following < len(order):
+                        try:
+                            await asyncio.wait_for(done.wait(), self.hedge_delay(order[following - 1]))
+                        except asyncio.TimeoutError:
+                            print('No answer from', order[following - 1].url, 'yet, also asking',
+                                  order[following].url)
+                            ask(order[following])
+                            following += 1
+                            in_flight += 1
+                            continue
+                    else:
+                        await done.wait()
+                done.clear()
+                while finished:
+                    source, data = finished.pop(0)
+                    in_flight -= 1
+                    if data is not None:
+                        return data
+                    if following < len(order):
+                        # Fail over straight away
+                        ask(order[following])
+                        following += 1
+                        in_flight += 1
+        finally:
+            for task in tasks:
+                task.cancel()
+        return None
+
+    def first(self, fetch_one):
+        """fetch() without hedging, for blocking callers: one source after another"""
+        for source in self.ranked():
+            start = utime.ticks_ms()
+            try:
+                data = fetch_one(source.url)
+            except Exception as e:
+                print('Source', source.url, 'failed:', repr(e))
+                data = None
+            if data is not None:
+                source.succeeded(utime.ticks_diff(utime.ticks_ms(), start))
+                return data
+            source.failed()
+        return None
+
+    def status(self):
+        return [source.status() for source in self.ranked()]
@@ -6,31 +6,125 @@ Works in a similar way to python-requests http://docs.python-requests.org/en/lat
 """
 
 import socket
+import select
+import time
 try:
     import ussl as ssl
 except:
     import ssl
 import binascii
+import dns_cache
+
+# Bytes read from the socket at a time while parsing the status line and headers
+HEADER_BUFFER = 256
+# Default chunk size of iter_content()
+CHUNK_SIZE = 512
+# Idle keep-alive connections a Pool keeps per host
+POOL_SIZE = 1
+# Seconds an idle pooled connection is reused for; servers drop them after a while
+IDLE_TIMEOUT = 60
+
+class Pool:
+    """Idle HTTP/1.1 connections kept for reuse, per (scheme, host, port)
+
+    Requests made with pool=... speak HTTP/1.1 and hand their connection
+    back here once the body has been read to its end, so the next request
+    to the same host skips the DNS lookup and the TCP (and TLS) handshake.
+    A connection the server has closed while idle reads as ready and is
+    dropped before use; one that fails anyway is retried once on a fresh
+    socket.
+    """
+    def __init__(self, size=POOL_SIZE, idle_timeout=IDLE_TIMEOUT):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        # key -> [(socket, time it went idle)], oldest first
+        self._idle = {}
+        self.hits = 0
+        self.misses = 0
+        self.retries = 0
+
+    def get(self, key):
+        """An idle connection to key that still looks open, or None"""
+        idle = self._idle.get(key)
+        now = time.time()
+        while idle:
+            sock, since = idle.pop()
+            if now - since < self.idle_timeout and self._alive(sock):
+                self.hits += 1
+                return sock
+            sock.close()
+        self.misses += 1
+        return None
+
+    def put(self, key, sock):
+        idle = self._idle.setdefault(key, [])
+        idle.append((sock, time.time()))
+        while len(idle) > self.size:
+            idle.pop(0)[0].close()
+
+    def _alive(self, sock):
+        # Nothing is due on an idle connection: readable means closed (EOF)
+        try:
+            poller = select.poll()
+            poller.register(sock, select.POLLIN)
+            return not poller.poll(0)
+        except (OSError, ValueError):
+            return False
+
+    def close(self):
+        for idle in self._idle.values():
+            for sock, since in idle:
+                sock.close()
+        self._idle = {}
+
+# Shared by callers that poll the same hosts
+POOL = Pool()
+
+def _connect(scheme, host, port, timeout):
+    addr = dns_cache.getaddr(host, int(port))
+    if scheme == 'http':
+        s = socket.socket()
+        s.settimeout(timeout)
+        s.connect(addr)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_SEC)
+        sock.settimeout(timeout)
+        s = ssl.wrap_socket(sock)
+        s.connect(addr)
+    return s
 
 class URLOpener:
-    def __init__(self, url, method, params = {}, data = {}, headers = {}, cookies = {}, auth = (), timeout = 5):
-        self.status_code = 0
-        self.headers = {}
-        self.text = ""
+    """Response to a request
+
+    The status line and headers are parsed as they arrive, from a small
+    reusable buffer. Unless stream is set the body is then read into
+    content, a bytearray allocated once at its Content-Length. With
+    stream=True the socket is left open after the headers and the body is
+    read with readinto() or iter_content(); call close() when done.
+
+    etag and last_modified make the request conditional (If-None-Match,
+    If-Modified-Since); not_modified is then set on a 304, which has no
+    body. body_crc is the crc32 of the body bytes read so far.
+
+    Without a pool the request is HTTP/1.0 on a new socket that is closed
+    afterwards. With one it is HTTP/1.1 on a pooled connection: bodies are
+    framed by Content-Length or chunked encoding, and close() returns the
+    connection to the pool when the body was read to its end.
+    """
+    def __init__(self, url, method, params = {}, data = {}, headers = {}, cookies = {}, auth = (), timeout = 5, stream = False,
+                 etag = None, last_modified = None, pool = None):
+        self.content = None
+        self.sock = None
         self.url = url
         [scheme, host, port, path, query_string] = urlparse(self.url)
+        if etag or last_modified:
+            headers = dict(headers)
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
         if auth and isinstance(auth, tuple) and len(auth) == 2:
             headers['Authorization'] = 'Basic %s' % (b64encode('%s:%s' % (auth[0], auth[1])))
-        if scheme == 'http':
-            addr = socket.getaddrinfo(host, int(port))[0][-1]
-            s = socket.socket()
-            s.settimeout(5)
-            s.connect(addr)
-        else:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_SEC)
-            sock.settimeout(5)
-            s = ssl.wrap_socket(sock)
-            s.connect(socket.getaddrinfo(host, port)[0][4])
         if params:
             enc_params = urlencode(params)
             path = path + '?' + enc_params.strip()
@@ -41,7 +135,8 @@ class URLOpener:
         if cookies:
             for k, v in cookies.items():
                 header_string += 'Cookie: %s=%s\r\n' % (k, quote_plus(v))
-        request = b'%s %s HTTP/1.0\r\n%s' % (method, path, header_string)
+        version = 'HTTP/1.1' if pool is not None else 'HTTP/1.0'
+        request = '%s %s %s\r\n%s' % (method, path, version, header_string)
         if data:
             if isinstance(data, dict):
                 enc_data = urlencode(data)
@@ -51,34 +146,229 @@ class URLOpener:
             else:
                 request += 'Content-Length: %s\r\n\r\n%s\r\n' % (len(data), data)
         request += '\r\n'
-        s.send(request)
-        while 1:
-            recv = s.recv(1024)
-            if len(recv) == 0: break
-            self.text += recv.decode()
-        s.close()
-        self._parse_result()
+        request = request.encode()
+
+        self._pool = pool
+        self._key = (scheme, host, port)
+        while True:
+            s = pool.get(self._key) if pool is not None else None
+            reused = s is not None
+            if s is None:
+                s = _connect(scheme, host, port, timeout)
+            try:
+                s.send(request)
+                self._start(s, method)
+                if reused and not self.status_code:
+                    raise OSError('connection closed')
+                break
+            except OSError:
+                s.close()
+                self.sock = None
+                if not reused:
+                    raise
+                # The server dropped the idle connection: once more on a new one
+                pool.retries += 1
+        if not stream:
+            try:
+                self.content = self.read_body()
+            finally:
+                self.close()
+
+    def _start(self, sock, method):
+        """Parse the status line and headers from sock"""
+        self.sock = sock
+        # MicroPython streams have readinto(); CPython sockets recv_into()
+        self._sock_readinto = getattr(sock, 'readinto', None) or sock.recv_into
+        self.status_code = 0
+        self.headers = {}
+        self.content_length = None
+        self.body_crc = 0
+        self._buf = bytearray(HEADER_BUFFER)
+        self._view = memoryview(self._buf)
+        # Unconsumed bytes in _buf
+        self._pos = 0
+        self._end = 0
+        line = self._readline()
+        keep_alive = line[0:8] == 'HTTP/1.1'
+        if line[0:4] == 'HTTP':
+            self.status_code = int(line.split(' ')[1])
+        self._chunked = False
+        while True:
+            line = self._readline()
+            if not line:
+                break
+            i = line.find(':')
+            if i > 0:
+                key = line[:i]
+                value = line[i + 1:].strip()
+                self.headers[key] = value
+                key = key.lower()
+                if key == 'content-length':
+                    self.content_length = int(value)
+                elif key == 'transfer-encoding':
+                    self._chunked = 'chunked' in value.lower()
+                elif key == 'connection':
+                    keep_alive = value.lower() == 'keep-alive'
+        # Body bytes left to read; None means until the server closes
+        self._remaining = self.content_length
+        # Bytes left in the current chunk, and whether the last one was read
+        self._chunk_left = 0
+        self._done = False
+        if method == 'HEAD' or self.status_code in (204, 304) or self.status_code < 200:
+            self._remaining = 0
+            self._chunked = False
+        elif self._chunked:
+            self._remaining = None
+        # Only a body with known framing leaves the connection usable
+        self._reusable = keep_alive and (self._chunked or self._remaining is not None)
+
+    @property
+    def not_modified(self):
+        return self.status_code == 304
+
+    def header(self, name):
+        """Value of header name (any case), or None"""
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return None
+
+    def _fill(self):
+        n = self._sock_readinto(self._buf)
+        self._pos = 0
+        self._end = n or 0
+        return self._end
+
+    def _readline(self):
+        """Next header line without its line break, '' at the end of the headers"""
+        buf = self._buf
+        line = b''
+        while True:
+            if self._pos == self._end and not self._fill():
+                break
+            start = i = self._pos
+            end = self._end
+            while i < end and buf[i] != 10:
+                i += 1
+            line += self._view[start:i]
+            if i < end:
+                self._pos = i + 1
+                break
+            self._pos = end
+        return str(line, 'utf-8').rstrip('\r')
+
+    def readinto(self, buf):
+        """Read body bytes into buf; returns how many, 0 at the end of the body"""
+        n = len(buf)
+        if self._chunked:
+            if not self._chunk_left and not self._next_chunk():
+                return 0
+            n = min(n, self._chunk_left)
+        elif self._remaining is not None:
+            if self._remaining <= 0:
+                return 0
+            n = min(n, self._remaining)
+        view = memoryview(buf)
+        if self._pos < self._end:
+            # Body bytes already in the header buffer
+            n = min(n, self._end - self._pos)
+            view[:n] = self._view[self._pos:self._pos + n]
+            self._pos += n
+        else:
+            n = self._sock_readinto(view[:n]) or 0
+        if self._chunked:
+            self._chunk_left -= n
+            if n and not self._chunk_left:
+                # The line break after the chunk data
+                self._readline()
+        elif self._remaining is not None:
+            self._remaining -= n
+        if n:
+            self.body_crc = binascii.crc32(view[:n], self.body_crc)
+        return n
+
+    def _next_chunk(self):
+        """Read the next chunk size; False at the last chunk or a broken stream"""
+        if self._done:
+            return False
+        try:
+            size = int(self._readline().split(';')[0], 16)
+        except ValueError:
+            # Connection closed mid-body
+            self._reusable = False
+            return False
+        if not size:
+            # Skip any trailers up to the blank line
+            while self._readline():
+                pass
+            self._done = True
+            return False
+        self._chunk_left = size
+        return True
+
+    def _body_read(self):
+        if self._pos < self._end:
+            return False
+        if self._chunked:
+            return self._done
+        return self._remaining == 0
+
+    def iter_content(self, chunk_size=CHUNK_SIZE):
+        """Yield the body in chunks
+
+        Each chunk is a memoryview of one reused buffer, only valid until
+        the next one is requested.
+        """
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        while True:
+            n = self.readinto(buf)
+            if not n:
+                return
+            yield view[:n]
+
+    def read_body(self):
+        """The rest of the body
+
+        With a Content-Length it is read into one preallocated bytearray;
+        otherwise the chunks are joined once at the end.
+        """
+        if self._remaining is None:
+            return b''.join([bytes(chunk) for chunk in self.iter_content()])
+        body = bytearray(self._remaining)
+        view = memoryview(body)
+        got = 0
+        while got < len(body):
+            n = self.readinto(view[got:])
+            if not n:
+                # Connection closed early
+                return body[:got]
+            got += n
+        return body
+
+    def close(self):
+        """Close the connection, or return it to the pool if it can be reused"""
+        if self.sock is None:
+            return
+        if self._pool is not None and self._reusable and self._body_read():
+            self._pool.put(self._key, self.sock)
+        else:
+            self.sock.close()
+        self.sock = None
+
+    @property
+    def text(self):
+        if self.content is None:
+            try:
+                self.content = self.read_body()
+            finally:
+                self.close()
+        return str(self.content, 'utf-8')
 
     def read(self):
         return self.text
 
-    def _parse_result(self):
-        self.text = self.text.split('\r\n')
-        while self.text:
-            line = self.text.pop(0).strip()
-            if line == '':
-                 break
-            if line[0:4] == 'HTTP':
-                data = line.split(' ')
-                self.status_code = int(data[1])
-                continue
-            if len(line.split(':')) >= 2:
-                data = line.split(':')
-                self.headers[data[0]] = (':'.join(data[1:])).strip()
-                continue
-        self.text = '\r\n'.join(self.text)
-        return
-
 def urlparse(url):
     scheme = url.split('://')[0].lower()
     url = url.split('://')[1]
@@ -118,10 +408,11 @@ def head(url, **kwargs):
 def options(url, **kwargs):
     return urlopen(url, "OPTIONS", **kwargs)
 
-def urlopen(url, method="GET", params = {}, data = {}, headers = {}, cookies = {}, auth = (), timeout = 5, **kwargs):
+def urlopen(url, method="GET", params = {}, data = {}, headers = {}, cookies = {}, auth = (), timeout = 5, stream = False,
+            etag = None, last_modified = None, pool = None, **kwargs):
     orig_url = url
     attempts = 0
-    result = URLOpener(url, method, params, data, headers, cookies, auth, timeout)
+    result = URLOpener(url, method, params, data, headers, cookies, auth, timeout, stream, etag, last_modified, pool)
     ## Maximum of 4 redirects
     while attempts < 4:
         attempts += 1
@@ -131,7 +422,8 @@ def urlopen(url, method="GET", params = {}, data = {}, headers = {}, cookies = {
                 [scheme, host, path, data] = urlparse(orig_url)
                 url = '%s://%s%s' % (scheme, host, url)
             if url:
-                result = URLOpener(url)
+                result.close()
+                result = URLOpener(url, method, timeout=timeout, stream=stream, etag=etag, last_modified=last_modified, pool=pool)
             else:
                 raise Exception('URL returned a redirect but one was not found')
         else:
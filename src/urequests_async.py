@@ -0,0 +1,250 @@
+"""HTTP GET for uasyncio, so a poll does not stall the web server
+
+The blocking urequests waits on each socket call for up to its timeout,
+and nothing else in the main loop runs meanwhile. Here connecting,
+sending and receiving go through uasyncio streams, and the other tasks
+run whenever the request is waiting on the network. Instead of one
+socket timeout there are three:
+
+    connect_timeout     until the connection is up
+    first_byte_timeout  from sending the request to the status line
+    total_timeout       for the whole request, body included
+
+Any of them running out raises uasyncio's TimeoutError. The host is
+resolved through dns_cache, for https too.
+
+Without a pool a request is one-shot HTTP/1.0. With one (POOL is shared
+by the API polls) it is HTTP/1.1: bodies are framed by Content-Length or
+chunked encoding, and close() hands the connection back to the pool
+once the body was read to its end, so the next poll to the same host
+skips the TCP and TLS handshakes. A pooled connection the server has
+closed is dropped before use, and a request that fails on one anyway is
+retried once on a new connection. On CPython asyncio stands in, for the
+host benchmarks.
+"""
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+import binascii
+import utime
+import dns_cache
+import urequests
+from urequests import urlparse
+
+CONNECT_TIMEOUT = 5
+FIRST_BYTE_TIMEOUT = 5
+TOTAL_TIMEOUT = 15
+# Seconds an idle pooled connection is kept: past the shortest poll
+# interval, since a connection the server closed sooner is noticed anyway
+IDLE_TIMEOUT = 120
+
+class Connection:
+    """A uasyncio stream pair, as kept in a Pool"""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def socket(self):
+        # uasyncio streams hold the socket as s; asyncio hands it out
+        get_extra_info = getattr(self.writer, 'get_extra_info', None)
+        if get_extra_info is None:
+            return self.writer.s
+        return get_extra_info('socket')
+
+    def close(self):
+        self.writer.close()
+
+class Pool(urequests.Pool):
+    """urequests.Pool for Connections"""
+    def _alive(self, conn):
+        # asyncio may already have read the server's FIN off the socket
+        at_eof = getattr(conn.reader, 'at_eof', None)
+        if at_eof is not None and at_eof():
+            return False
+        sock = conn.socket()
+        return sock is not None and urequests.Pool._alive(self, sock)
+
+# Shared by the API polls
+POOL = Pool(idle_timeout=IDLE_TIMEOUT)
+
+class Response:
+    """Status and headers of a response; read the body with read()"""
+    def __init__(self, conn, deadline, pool=None, key=None):
+        self.conn = conn
+        self.reader = conn.reader
+        self.deadline = deadline
+        self.status_code = 0
+        self.headers = {}
+        self.content_length = None
+        self.body_crc = 0
+        self._remaining = None
+        self._chunked = False
+        self._chunk_left = 0
+        self._done = False
+        self._reusable = False
+        self._pool = pool
+        self._key = key
+
+    @property
+    def not_modified(self):
+        return self.status_code == 304
+
+    def header(self, name):
+        """Value of header name (any case), or None"""
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return None
+
+    def _left(self):
+        """Seconds left of the total timeout"""
+        left = utime.ticks_diff(self.deadline, utime.ticks_ms()) / 1000
+        if left <= 0:
+            raise asyncio.TimeoutError
+        return left
+
+    async def _readline(self):
+        line = await asyncio.wait_for(self.reader.readline(), self._left())
+        return str(line, 'utf-8').rstrip('\r\n')
+
+    async def _start(self, method, first_byte_timeout):
+        line = await asyncio.wait_for(self.reader.readline(), min(first_byte_timeout, self._left()))
+        line = str(line, 'utf-8')
+        keep_alive = line[0:8] == 'HTTP/1.1'
+        if line[0:4] == 'HTTP':
+            self.status_code = int(line.split(' ')[1])
+        while True:
+            line = await self._readline()
+            if not line:
+                break
+            i = line.find(':')
+            if i > 0:
+                key = line[:i]
+                value = line[i + 1:].strip()
+                self.headers[key] = value
+                key = key.lower()
+                if key == 'content-length':
+                    self.content_length = int(value)
+                elif key == 'transfer-encoding':
+                    self._chunked = 'chunked' in value.lower()
+                elif key == 'connection':
+                    keep_alive = value.lower() == 'keep-alive'
+        self._remaining = self.content_length
+        if method == 'HEAD' or self.status_code in (204, 304) or self.status_code < 200:
+            self._remaining = 0
+            self._chunked = False
+        elif self._chunked:
+            self._remaining = None
+        # Only a body with known framing leaves the connection usable
+        self._reusable = keep_alive and (self._chunked or self._remaining is not None)
+
+    async def _next_chunk(self):
+        """Read the next chunk size; False at the last chunk or a broken stream"""
+        if self._done:
+            return False
+        try:
+            size = int((await self._readline()).split(';')[0], 16)
+        except ValueError:
+            # Connection closed mid-body
+            self._reusable = False
+            return False
+        if not size:
+            # Skip any trailers up to the blank line
+            while await self._readline():
+                pass
+            self._done = True
+            return False
+        self._chunk_left = size
+        return True
+
+    async def read(self, n):
+        """Up to n body bytes; b'' at the end of the body"""
+        if self._chunked:
+            if not self._chunk_left and not await self._next_chunk():
+                return b''
+            n = min(n, self._chunk_left)
+        elif self._remaining is not None:
+            if self._remaining <= 0:
+                return b''
+            n = min(n, self._remaining)
+        data = await asyncio.wait_for(self.reader.read(n), self._left())
+        if self._chunked:
+            self._chunk_left -= len(data)
+            if not data:
+                self._reusable = False
+            elif not self._chunk_left:
+                # The line break after the chunk data
+                await self._readline()
+        elif self._remaining is not None:
+            self._remaining -= len(data)
+            if not data:
+                self._reusable = False
+        if data:
+            self.body_crc = binascii.crc32(data, self.body_crc)
+        return data
+
+    def _body_read(self):
+        if self._chunked:
+            return self._done
+        return self._remaining == 0
+
+    def close(self):
+        """Hand the connection back to the pool if the body was read to its end"""
+        if self.conn is None:
+            return
+        if self._pool is not None and self._reusable and self._body_read():
+            self._pool.put(self._key, self.conn)
+        else:
+            self.conn.close()
+        self.conn = None
+
+async def get(url, headers={}, etag=None, last_modified=None, connect_timeout=CONNECT_TIMEOUT,
+              first_byte_timeout=FIRST_BYTE_TIMEOUT, total_timeout=TOTAL_TIMEOUT, pool=None):
+    """Send a GET and return its Response once the headers are in"""
+    deadline = utime.ticks_add(utime.ticks_ms(), int(total_timeout * 1000))
+    scheme, host, port, path, query_string = urlparse(url)
+    if query_string:
+        path += '?' + query_string
+    port = int(port)
+    version = 'HTTP/1.1' if pool is not None else 'HTTP/1.0'
+    request = 'GET %s %s\r\nHost: %s\r\n' % (path, version, host)
+    for k, v in headers.items():
+        request += '%s: %s\r\n' % (k, v)
+    if etag:
+        request += 'If-None-Match: %s\r\n' % etag
+    if last_modified:
+        request += 'If-Modified-Since: %s\r\n' % last_modified
+    request = (request + '\r\n').encode()
+    key = (scheme, host, port)
+    while True:
+        conn = pool.get(key) if pool is not None else None
+        reused = conn is not None
+        if conn is None:
+            # The cached address keeps the resolver out of open_connection()
+            addr = dns_cache.resolve(host, port)
+            if scheme == 'https':
+                # The certificate is still checked against the host name
+                connect = asyncio.open_connection(addr, port, ssl=True, server_hostname=host)
+            else:
+                connect = asyncio.open_connection(addr, port)
+            reader, writer = await asyncio.wait_for(connect, min(connect_timeout, total_timeout))
+            conn = Connection(reader, writer)
+        response = Response(conn, deadline, pool, key)
+        try:
+            conn.writer.write(request)
+            await asyncio.wait_for(conn.writer.drain(), response._left())
+            await response._start('GET', first_byte_timeout)
+            if reused and not response.status_code:
+                raise OSError('connection closed')
+            return response
+        except OSError:
+            conn.close()
+            if not reused:
+                raise
+            # The server dropped the idle connection: once more on a new one
+            pool.retries += 1
+        except:
+            conn.close()
+            raise
@@ -2,6 +2,17 @@ import socket
 import ujson
 import utime
 import config
+import screenshot
+
+def request_header(request, name):
+    """Value of header name in a raw request, or None"""
+    prefix = name.lower() + ':'
+    for line in request.split('\r\n')[1:]:
+        if not line:
+            break
+        if line.lower().startswith(prefix):
+            return line[len(prefix):].strip()
+    return None
 
 class SimpleWebServer:
     def __init__(self, port=80):
@@ -9,6 +20,53 @@ class SimpleWebServer:
         self.latest_data = None
         self.last_updated = None
         self.config = config.load_config()
+        # Display whose front frame /api/screen serves
+        self.screen = None
+        self.screenshot = None
+        # PollScheduler and sources.Sources whose state /api/poller serves
+        self.poller = None
+        self.sources = None
+
+    def set_screen(self, display):
+        """Serve the frame on display's panel (its front slot) at /api/screen"""
+        self.screen = display
+        epd = display.epd
+        self.screenshot = screenshot.Screenshot(epd.hw_width, epd.hw_height)
+
+    def send_screen(self, cl, request, path):
+        """Stream what the panel shows as PNG (or PBM with ?format=pbm)
+
+        The ETag is the frame digest, so a client revalidating an unchanged
+        frame gets a 304 and no image. Until the display knows which frame
+        the panel shows (see SpaceDisplay.front_ready) there is only a 503.
+        """
+        if self.screen is None:
+            cl.send(b'HTTP/1.1 503 Service Unavailable\r\nContent-Type: text/plain\r\n\r\nNo display\n')
+            return
+        if not self.screen.front_ready:
+            cl.send(b'HTTP/1.1 503 Service Unavailable\r\nContent-Type: text/plain\r\nRetry-After: 60\r\n\r\nFrame not known yet\n')
+            return
+        fmt = 'pbm' if 'format=pbm' in path else 'png'
+        frame = self.screen.front
+        etag = '"{:08x}-{}"'.format(frame.digest(), fmt)
+        if request_header(request, 'If-None-Match') == etag:
+            cl.send(f'HTTP/1.1 304 Not Modified\r\nETag: {etag}\r\n\r\n'.encode('utf-8'))
+            return
+        shot = self.screenshot
+        cl.send(f"""HTTP/1.1 200 OK\r
+Content-Type: {screenshot.FORMATS[fmt]}\r
+Content-Length: {shot.length(fmt)}\r
+ETag: {etag}\r
+Cache-Control: no-cache\r
+Access-Control-Allow-Origin: *\r
+\r
+""".encode('utf-8'))
+        shot.stream(fmt, frame.buffer_black, frame.buffer_red, cl.sendall)
+
+    def set_poller(self, poller, sources=None):
+        """Serve poller's status() (and the sources' health) at /api/poller"""
+        self.poller = poller
+        self.sources = sources
 
     def set_data(self, data, timestamp):
         """Store the latest API data and timestamp"""
@@ -134,6 +192,31 @@ Content-Type: text/plain
 
 Error: {e}"""
 
+            elif method == 'GET' and path.startswith('/api/screen'):
+                # Streamed straight to the socket, not built as a response
+                try:
+                    self.send_screen(cl, request, path)
+                finally:
+                    cl.close()
+                return
+
+            elif 'GET /api/poller' in request:
+                if self.poller:
+                    status = self.poller.status()
+                    if self.sources:
+                        status['sources'] = self.sources.status()
+                    response = f"""HTTP/1.1 200 OK
+Content-Type: application/json
+Access-Control-Allow-Origin: *
+
+{ujson.dumps(status)}
+"""
+                else:
+                    response = """HTTP/1.1 503 Service Unavailable
+Content-Type: application/json
+
+{"error": "Poller not running"}
+"""
             elif 'GET /api/latest' in request:
                 # Return JSON data
                 if self.latest_data:
@@ -367,7 +450,6 @@ Content-Type: application/json
             <pre>{
   "data": {
     "number": 12,
-    "message": "success",
     "people": [
       {
         "name": "Oleg Kononenko",
@@ -396,6 +478,24 @@ Content-Type: application/json
   });</pre>
         </div>
 
+        <h3>Get the Screen Image</h3>
+        <div class="endpoint">
+            <span class="method">GET</span>
+            <span>/api/screen</span>
+        </div>
+        <p>Returns what the e-paper currently shows as a PNG, or as a black and white PBM with <code>?format=pbm</code>. The <code>ETag</code> changes with the frame, so revalidating with <code>If-None-Match</code> returns <code>304 Not Modified</code> until the display changes. Right after a boot, until the frame on the panel is known, it returns <code>503 Service Unavailable</code>.</p>
+
+        <div class="example">
+            <pre>curl -o screen.png http://192.168.5.216/api/screen</pre>
+        </div>
+
+        <h3>Get the API Poller State</h3>
+        <div class="endpoint">
+            <span class="method">GET</span>
+            <span>/api/poller</span>
+        </div>
+        <p>Returns how the device polls Open Notify: the circuit breaker <code>state</code> (<code>closed</code>, <code>open</code> or <code>half-open</code>), the current polling <code>interval</code> and the <code>delay</code> before the next poll in seconds, <code>next_poll</code> as a Unix timestamp, consecutive <code>failures</code>, the <code>last_outcome</code> (<code>changed</code>, <code>unchanged</code> or <code>failed</code>) and totals of <code>polls</code>, <code>changes</code> and <code>errors</code>. <code>sources</code> lists the data sources best first, each with its <code>url</code>, average <code>latency_ms</code>, consecutive <code>failures</code>, <code>successes</code>, <code>errors</code> and <code>score</code> (lower is better).</p>
+
         <h3>Response Fields</h3>
         <ul>
             <li><code>data</code> - The astronaut data from the Open Notify API</li>
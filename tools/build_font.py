@@ -0,0 +1,251 @@
+"""Build the packed proportional font used by src/bitmap_font.py
+
+    python3 tools/build_font.py [--out src/font.pf]
+
+The glyphs start from the classic 5x7 font (the one sim/modules/framebuf.py
+uses for framebuf.text) with blank columns trimmed, so text is proportional.
+Latin-1 and Latin Extended-A letters are composed from a base letter plus
+accent marks via their Unicode decomposition, so accented crew names render
+instead of falling back to boxes.
+
+File layout (little endian):
+
+    header  '<2sBBBxH'  b'PF', version, height, top, glyph count
+    index   '<HH' * n   code point, offset of the glyph; sorted by code point
+    glyph   '<BB'       bitmap width, advance
+            rows        height rows of (width + 7) // 8 bytes, MONO_HLSB, ink 1
+
+`top` is the number of rows above the capitals; text drawn at y has its
+capitals start at y, like framebuf.text().
+"""
+import argparse
+import os
+import struct
+import sys
+import unicodedata
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'sim', 'modules'))
+from framebuf import _FONT_5X7, _BOX
+
+VERSION = 1
+HEIGHT = 10
+TOP = 2             # rows above the capitals, for their accents
+BASE_ROWS = 7
+SPACING = 1         # blank columns after each glyph
+SPACE_ADVANCE = 3
+FALLBACK = 0xFFFD
+
+# Marks drawn above the letter ('#' is ink), keyed by combining character
+ABOVE = {
+    0x0300: ('#.', '.#'),               # grave
+    0x0301: ('.#', '#.'),               # acute
+    0x0302: ('.#.', '#.#'),             # circumflex
+    0x0303: ('.#.#', '#.#.'),           # tilde
+    0x0304: ('###',),                   # macron
+    0x0306: ('#..#', '.##.'),           # breve
+    0x0307: ('#',),                     # dot
+    0x0308: ('#.#',),                   # diaeresis
+    0x030A: ('##', '##'),               # ring
+    0x030B: ('.#.#', '#.#.'),           # double acute
+    0x030C: ('#.#', '.#.'),             # caron
+}
+# Marks drawn below the letter, with how they are aligned
+BELOW = {
+    0x0326: (('#',), 'center'),         # comma below
+    0x0327: (('##',), 'center'),        # cedilla
+    0x0328: (('##',), 'right'),         # ogonek
+}
+
+# Ranges composed from decompositions, on top of ASCII
+EXTRA_RANGES = ((0x00C0, 0x017F), (0x0218, 0x021B))
+
+def empty(width):
+    return [[0] * width for _ in range(HEIGHT)]
+
+def from_columns(columns):
+    grid = empty(len(columns))
+    for col, bits in enumerate(columns):
+        for row in range(BASE_ROWS):
+            if bits & (1 << row):
+                grid[TOP + row][col] = 1
+    return grid
+
+def trim(grid):
+    """Drop blank columns on both sides"""
+    used = [c for c in range(len(grid[0])) if any(row[c] for row in grid)]
+    if not used:
+        return [[] for _ in grid]
+    return [row[used[0]:used[-1] + 1] for row in grid]
+
+def width_of(grid):
+    return len(grid[0])
+
+def ascii_glyph(ch):
+    i = ord(ch) - 32
+    return trim(from_columns(_FONT_5X7[i * 5:i * 5 + 5]))
+
+def top_row(grid):
+    for r, row in enumerate(grid):
+        if any(row):
+            return r
+    return HEIGHT
+
+def bottom_row(grid):
+    for r in range(HEIGHT - 1, -1, -1):
+        if any(grid[r]):
+            return r
+    return -1
+
+def dotless(grid):
+    """i and j without their dot, before an accent goes on top"""
+    grid = [row[:] for row in grid]
+    for r in range(TOP, TOP + 2):
+        grid[r] = [0] * width_of(grid)
+    return grid
+
+def overlay(grid, mark, row, col):
+    for r, line in enumerate(mark):
+        for c, cell in enumerate(line):
+            if cell == '#' and 0 <= row + r < HEIGHT and 0 <= col + c < width_of(grid):
+                grid[row + r][col + c] = 1
+
+def widen(grid, width):
+    """Pad grid symmetrically to at least width columns"""
+    extra = width - width_of(grid)
+    if extra <= 0:
+        return grid
+    left = extra // 2
+    return [[0] * left + row + [0] * (extra - left) for row in grid]
+
+def add_above(grid, mark):
+    grid = widen(grid, len(mark[0]))
+    grid = [row[:] for row in grid]
+    top = top_row(grid)
+    # Lower case keeps a blank row under the mark; capitals have no room
+    bottom = max(top - 2, len(mark) - 1)
+    col = (width_of(grid) - len(mark[0]) + 1) // 2
+    overlay(grid, mark, bottom - len(mark) + 1, col)
+    return grid
+
+def add_below(grid, mark, align):
+    grid = [row[:] for row in grid]
+    row = min(bottom_row(grid) + 1, HEIGHT - 1)
+    if align == 'right':
+        col = width_of(grid) - len(mark[0])
+    else:
+        col = (width_of(grid) - len(mark[0])) // 2
+    overlay(grid, mark, row, col)
+    return grid
+
+def ligature(a, b):
+    """Two glyphs sharing one column"""
+    return [ra[:-1] + [ra[-1] | rb[0]] + rb[1:] for ra, rb in zip(a, b)]
+
+def from_rows(rows):
+    grid = empty(len(rows[0]))
+    for r, line in enumerate(rows):
+        for c, cell in enumerate(line):
+            grid[TOP + r][c] = int(cell == '#')
+    return grid
+
+def pad_left(grid):
+    return [[0] + row for row in grid]
+
+def slashed(grid, cells):
+    grid = [row[:] for row in grid]
+    for r, c in cells:
+        grid[TOP + r][c] = 1
+    return grid
+
+def special_glyphs():
+    g = {}
+    o, O = ascii_glyph('o'), ascii_glyph('O')
+    g['ø'] = slashed(o, [(6, 0), (5, 1), (4, 2), (3, 3), (2, 4)])
+    g['Ø'] = slashed(O, [(6, 0), (5, 1), (3, 2), (1, 3), (0, 4)])
+    g['ł'] = slashed(ascii_glyph('l'), [(4, 0), (2, 2)])
+    g['Ł'] = slashed(pad_left(ascii_glyph('L')), [(4, 0), (2, 2)])
+    g['đ'] = slashed(ascii_glyph('d'), [(1, 3)])
+    g['Đ'] = slashed(pad_left(ascii_glyph('D')), [(3, 0), (3, 2)])
+    g['ı'] = dotless(ascii_glyph('i'))
+    g['æ'] = ligature(ascii_glyph('a'), ascii_glyph('e'))
+    g['Æ'] = ligature(ascii_glyph('A'), ascii_glyph('E'))
+    g['œ'] = ligature(o, ascii_glyph('e'))
+    g['Œ'] = ligature(O, ascii_glyph('E'))
+    g['ß'] = from_rows(('.##.', '#..#', '#.#.', '#..#', '#..#', '#.#.', '#...'))
+    return g
+
+def composed_glyph(code, glyphs):
+    parts = unicodedata.decomposition(chr(code)).split()
+    if not parts or parts[0].startswith('<'):
+        return None
+    base = chr(int(parts[0], 16))
+    if base not in glyphs:
+        return None
+    grid = glyphs[base]
+    for part in parts[1:]:
+        mark = int(part, 16)
+        if mark in ABOVE:
+            if base in 'ij':
+                grid = dotless(grid)
+            grid = add_above(grid, ABOVE[mark])
+        elif mark in BELOW:
+            grid = add_below(grid, *BELOW[mark])
+        else:
+            return None
+    return grid
+
+def build_glyphs():
+    glyphs = {chr(c): ascii_glyph(chr(c)) for c in range(33, 127)}
+    glyphs[' '] = [[] for _ in range(HEIGHT)]
+    glyphs.update(special_glyphs())
+    for first, last in EXTRA_RANGES:
+        for code in range(first, last + 1):
+            ch = chr(code)
+            if ch in glyphs:
+                continue
+            grid = composed_glyph(code, glyphs)
+            if grid is not None:
+                glyphs[ch] = grid
+    glyphs[chr(FALLBACK)] = trim(from_columns(_BOX))
+    return glyphs
+
+def pack_glyph(grid):
+    width = width_of(grid)
+    advance = SPACE_ADVANCE if width == 0 else width + SPACING
+    out = bytearray(struct.pack('<BB', width, advance))
+    for row in grid:
+        for start in range(0, width, 8):
+            byte = 0
+            for bit, cell in enumerate(row[start:start + 8]):
+                if cell:
+                    byte |= 0x80 >> bit
+            out.append(byte)
+    return bytes(out)
+
+def pack_font(glyphs):
+    codes = sorted(ord(ch) for ch in glyphs)
+    header = struct.pack('<2sBBBxH', b'PF', VERSION, HEIGHT, TOP, len(codes))
+    offset = len(header) + 4 * len(codes)
+    index = bytearray()
+    data = bytearray()
+    for code in codes:
+        if offset + len(data) > 0xFFFF:
+            raise ValueError('font too large for 16-bit offsets')
+        index += struct.pack('<HH', code, offset + len(data))
+        data += pack_glyph(glyphs[chr(code)])
+    return header + bytes(index) + bytes(data)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default=os.path.join(ROOT, 'src', 'font.pf'))
+    args = parser.parse_args(argv)
+
+    glyphs = build_glyphs()
+    data = pack_font(glyphs)
+    with open(args.out, 'wb') as f:
+        f.write(data)
+    print('{} glyphs, {} bytes -> {}'.format(len(glyphs), len(data), args.out))
+
+if __name__ == '__main__':
+    sys.exit(main())